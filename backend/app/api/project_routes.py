@@ -1,9 +1,10 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from sqlalchemy import desc
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlalchemy.orm import Session, load_only
+from sqlalchemy import desc, func
+from typing import Optional
 
 from app.database.session import get_db
-from app.schemas.project_schema import ProjectCreate
+from app.schemas.project_schema import ProjectCreate, ProjectBulkDelete
 
 from app.services.project_service import ProjectService
 from app.services.report_service import ReportService
@@ -11,12 +12,20 @@ from app.services.report_service import ReportService
 from app.database.models import ResearchProject, Report
 from app.database.models import ReportSection
 
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, StreamingResponse, JSONResponse
 from app.services.export_service import ExportService
+from app.services.report_events import report_events
+from app.services.job_service import JobService
+from app.repositories.crawl_repository import CrawlRepository
+from app.repositories.report_repository import ReportRepository
+import asyncio
 import os
+import json
+import time
+
+from app.core.config import LONG_POLL_MAX_SECONDS, PROJECTS_PAGE_SIZE, PROJECTS_PAGE_MAX
 
 from app.database.models import Source
-from app.database.models import IEEEReport
 
 router = APIRouter(prefix="/projects", tags=["Projects"])
 
@@ -29,28 +38,37 @@ def create_project(payload: ProjectCreate, db: Session = Depends(get_db)):
 
 
 @router.get("/")
-def list_projects(db: Session = Depends(get_db)):
-    return ProjectService.list_projects(db)
+def list_projects(
+    response: Response,
+    limit: int = Query(PROJECTS_PAGE_SIZE, ge=1, le=PROJECTS_PAGE_MAX),
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_db),
+):
+    # Keyset paging, the next page's cursor travels in a header so the body stays a list
+    try:
+        projects, next_cursor = ProjectService.list_projects(db, limit=limit, cursor=cursor)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return projects
 
 
 
 # REPORT
 
 @router.post("/{project_id}/generate_simple_report")
-def generate_simple_report(project_id: int, db: Session = Depends(get_db)):
+def generate_simple_report(project_id: int, refresh: bool = Query(False), db: Session = Depends(get_db)):
     project = db.query(ResearchProject).filter(ResearchProject.id == project_id).first()
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
 
     # REUSE EXISTING REPORT IF EXISTS
-    existing = (
-        db.query(Report)
-        .filter(Report.project_id == project_id)
-        .order_by(desc(Report.id))
-        .first()
-    )
+    existing = ReportRepository.latest(db, project_id)
 
-    if existing and existing.full_content and len(existing.full_content) > 300:
+    # ?refresh=true re-runs a finished report, only sections whose inputs changed are regenerated
+    if ReportService.is_complete(existing) and not refresh:
         print(" Reusing existing report")
         return {
             "status": "ok",
@@ -58,14 +76,45 @@ def generate_simple_report(project_id: int, db: Session = Depends(get_db)):
             "reused": True
         }
 
-    # Otherwise generate new
-    service = ReportService(db)
-    report = service.generate_simple_report(project_id)
+    # Otherwise queue it, the report page picks up progress as it lands
+    job, created = JobService.enqueue_report(db, project_id, refresh=refresh)
 
     return {
-        "status": "ok",
-        "report_id": report.id,
-        "reused": False
+        "status": "queued",
+        "job_id": job.id,
+        "reused": False,
+        "coalesced": not created
+    }
+
+
+@router.get("/jobs/{job_id}")
+def get_job(job_id: int, db: Session = Depends(get_db)):
+    job = CrawlRepository.get(db, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return _job_payload(job)
+
+
+@router.get("/{project_id}/job")
+def get_latest_job(project_id: int, db: Session = Depends(get_db)):
+    job = CrawlRepository.get_latest_for_project(db, project_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="No job for this project")
+    return _job_payload(job)
+
+
+def _job_payload(job):
+    return {
+        "id": job.id,
+        "project_id": job.project_id,
+        "report_id": job.report_id,
+        "status": job.status,
+        "progress": job.progress,
+        "current_step": job.current_step,
+        "error": job.error_message,
+        "created_at": job.created_at,
+        "started_at": job.started_at,
+        "finished_at": job.finished_at,
     }
 
 
@@ -84,39 +133,232 @@ def expand_to_ieee(project_id: int, db: Session = Depends(get_db)):
     }
 
 
-@router.get("/{project_id}/report")
-def get_report(project_id: int, db: Session = Depends(get_db)):
-    report = (
-        db.query(Report)
+def _report_etag(report_id: int, revision: int) -> str:
+    return f'W/"r{report_id}.{revision}"'
+
+
+def _latest_head(db: Session, project_id: int):
+    # End the read transaction so MySQL doesn't serve a stale snapshot.
+    # Not the memoized lookup: a first report may appear while waiting
+    db.rollback()
+    return (
+        db.query(Report.id, Report.revision)
         .filter(Report.project_id == project_id)
-        .order_by(desc(Report.id)) 
+        .order_by(desc(Report.id))
         .first()
     )
 
-    if not report:
-        raise HTTPException(status_code=404, detail="Report not found")
 
-    return {
+async def _wait_for_revision(db: Session, project_id: int, since_revision: int, wait: int):
+    """
+    Long-poll: wait until the latest report moves past `since_revision`
+    or `wait` seconds pass. Returns the latest (id, revision) row.
+    """
+    # Token deltas don't change the revision, don't wake up for them
+    events = report_events.subscribe(project_id, types=("revision", "complete", "failed"))
+    try:
+        head = await asyncio.to_thread(_latest_head, db, project_id)
+        deadline = time.monotonic() + wait
+
+        while head and head.revision <= since_revision:
+            try:
+                event = await asyncio.wait_for(events.get(), max(deadline - time.monotonic(), 0))
+            except asyncio.TimeoutError:
+                # Events only reach this process; another worker's revision
+                # is only visible in the database
+                return await asyncio.to_thread(_latest_head, db, project_id)
+
+            if event.get("revision", since_revision + 1) > since_revision:
+                head = await asyncio.to_thread(_latest_head, db, project_id)
+
+        return head
+    finally:
+        report_events.unsubscribe(project_id, events)
+
+
+def _report_response(db: Session, head, since_revision: Optional[int], etag: str):
+    sections = (
+        db.query(ReportSection.id, ReportSection.order, ReportSection.revision)
+        .filter(ReportSection.report_id == head.id)
+        .order_by(ReportSection.order)
+        .all()
+    )
+
+    # Delta mode: section layout plus content only for sections that changed
+    if since_revision is not None and sections:
+        report = (
+            db.query(Report)
+            .options(load_only(Report.id, Report.title, Report.project_id, Report.revision))
+            .filter(Report.id == head.id)
+            .first()
+        )
+        changed = (
+            db.query(ReportSection)
+            .filter(
+                ReportSection.report_id == report.id,
+                ReportSection.revision > since_revision,
+            )
+            .order_by(ReportSection.order)
+            .all()
+        )
+
+        payload = {
+            "id": report.id,
+            "title": report.title,
+            "project_id": report.project_id,
+            "revision": report.revision,
+            "delta": True,
+            "section_ids": [s.id for s in sections],
+            "sections": [
+                {
+                    "id": s.id,
+                    "title": s.title,
+                    "content": s.content,
+                    "order": s.order,
+                    "revision": s.revision,
+                }
+                for s in changed
+            ],
+        }
+        return JSONResponse(payload, headers={"ETag": etag})
+
+    report = db.query(Report).filter(Report.id == head.id).first()
+
+    payload = {
         "id": report.id,
         "title": report.title,
         "full_content": report.full_content or "",
-        "project_id": report.project_id
+        "project_id": report.project_id,
+        "revision": report.revision,
+        "delta": False,
     }
+    return JSONResponse(payload, headers={"ETag": etag})
+
+
+@router.get("/{project_id}/report")
+async def get_report(
+    project_id: int,
+    request: Request,
+    since_revision: Optional[int] = None,
+    wait: int = Query(0, ge=0, le=LONG_POLL_MAX_SECONDS),
+    db: Session = Depends(get_db),
+):
+    # Async so a long-poll waits on the event loop instead of holding a
+    # threadpool thread; only the short queries run in threads.
+    # Cheap head lookup first, the full_content blob is only loaded if needed
+    if wait and since_revision is not None:
+        head = await _wait_for_revision(db, project_id, since_revision, wait)
+    else:
+        head = await asyncio.to_thread(ReportRepository.head, db, project_id, Report.id, Report.revision)
+
+    if not head:
+        raise HTTPException(status_code=404, detail="Report not found")
+
+    etag = _report_etag(head.id, head.revision)
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers={"ETag": etag})
+
+    if since_revision is not None and head.revision <= since_revision:
+        return Response(status_code=304, headers={"ETag": etag})
+
+    return await asyncio.to_thread(_report_response, db, head, since_revision, etag)
+
+
+@router.get("/{project_id}/report/summary")
+def get_report_summary(project_id: int, db: Session = Depends(get_db)):
+    # Dashboard view: never loads full_content, cost doesn't grow with report size
+    summary = ReportRepository.summary(db, project_id)
+    if not summary:
+        raise HTTPException(status_code=404, detail="Report not found")
+
+    return {
+        "id": summary.id,
+        "title": summary.title,
+        "project_id": summary.project_id,
+        "created_at": summary.created_at,
+        "revision": summary.revision,
+        "status": summary.status,
+        "progress": summary.progress,
+        "current_step": summary.current_step,
+        "length": summary.length,
+        "section_count": summary.section_count,
+    }
+
+
+def _stream_snapshot(db: Session, project_id: int):
+    """
+    (snapshot event, live). Live when the report is generating or a job for
+    it is queued, otherwise nothing more will be streamed.
+    """
+    report = ReportRepository.latest(db, project_id)
+    snapshot = {
+        "type": "snapshot",
+        "report_id": report.id if report else None,
+        "full_content": (report.full_content or "") if report else "",
+    }
+    live = (report is not None and report.status == "generating") or (
+        CrawlRepository.get_active_for_project(db, project_id) is not None
+    )
+    return snapshot, live
+
+
+@router.get("/{project_id}/report/stream")
+async def stream_report(project_id: int, db: Session = Depends(get_db)):
+    # Subscribe before the snapshot so no delta falls in between
+    events = report_events.subscribe(project_id)
+
+    try:
+        snapshot, live = await asyncio.to_thread(_stream_snapshot, db, project_id)
+    except Exception:
+        report_events.unsubscribe(project_id, events)
+        raise
+
+    # Async generator: waiting for events holds no thread, and a client
+    # disconnect cancels it right away
+    async def event_stream():
+        try:
+            yield f"event: snapshot\ndata: {json.dumps(snapshot)}\n\n"
+
+            # Finished, failed or idle: the snapshot is all there is
+            while live:
+                try:
+                    event = await asyncio.wait_for(events.get(), 15)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+
+                yield f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
+
+                if event["type"] in ("complete", "failed"):
+                    break
+        finally:
+            report_events.unsubscribe(project_id, events)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 
 @router.post("/{project_id}/ask_from_report")
-def ask_from_report(project_id: int, question: str, db: Session = Depends(get_db)):
+async def ask_from_report(project_id: int, question: str, db: Session = Depends(get_db)):
     service = ReportService(db)
-    answer = service.ask_from_report(project_id, question)
+    result = await service.aask_from_report(project_id, question)
 
     return {
         "question": question,
-        "answer": answer
+        **result
     }
 
 
 @router.post("/{project_id}/split_report")
 def split_report(project_id: int, db: Session = Depends(get_db)):
+    # The running job owns the section rows
+    report = ReportRepository.latest(db, project_id, with_content=False)
+    if report and report.status == "generating":
+        raise HTTPException(status_code=409, detail="Report is still being generated")
+
     service = ReportService(db)
     result = service.split_report_into_sections(project_id)
 
@@ -128,22 +370,13 @@ def split_report(project_id: int, db: Session = Depends(get_db)):
 
 @router.get("/{project_id}/sections")
 def get_sections(project_id: int, db: Session = Depends(get_db)):
-    report = (
-        db.query(Report)
-        .filter(Report.project_id == project_id)
-        .order_by(desc(Report.id))
-        .first()
-    )
+    # Report lookup and its sections in one joined query
+    latest = ReportRepository.latest_sections(db, project_id)
 
-    if not report:
+    if not latest:
         raise HTTPException(status_code=404, detail="Report not found")
 
-    sections = (
-        db.query(ReportSection)
-        .filter(ReportSection.report_id == report.id)
-        .order_by(ReportSection.order)
-        .all()
-    )
+    _, sections = latest
 
     return [
         {
@@ -159,12 +392,7 @@ def get_sections(project_id: int, db: Session = Depends(get_db)):
 
 @router.get("/{project_id}/download/word")
 def download_report_word(project_id: int, db: Session = Depends(get_db)):
-    report = (
-        db.query(Report)
-        .filter(Report.project_id == project_id)
-        .order_by(desc(Report.id))
-        .first()
-    )
+    report = ReportRepository.latest(db, project_id)
 
     if not report:
         raise HTTPException(status_code=404, detail="Report not found")
@@ -175,12 +403,7 @@ def download_report_word(project_id: int, db: Session = Depends(get_db)):
 
 @router.get("/{project_id}/download/pdf")
 def download_report_pdf(project_id: int, db: Session = Depends(get_db)):
-    report = (
-        db.query(Report)
-        .filter(Report.project_id == project_id)
-        .order_by(desc(Report.id))
-        .first()
-    )
+    report = ReportRepository.latest(db, project_id)
 
     if not report:
         raise HTTPException(status_code=404, detail="Report not found")
@@ -190,14 +413,25 @@ def download_report_pdf(project_id: int, db: Session = Depends(get_db)):
 
 
 @router.get("/{project_id}/sources")
-def get_sources(project_id: int, db: Session = Depends(get_db)):
+def get_sources(project_id: int, request: Request, db: Session = Depends(get_db)):
+    # Sources are append-only per project, so count + max id identifies the list
+    count, max_id = (
+        db.query(func.count(Source.id), func.max(Source.id))
+        .filter(Source.project_id == project_id)
+        .one()
+    )
+
+    etag = f'W/"s{project_id}.{count}.{max_id or 0}"'
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers={"ETag": etag})
+
     sources = (
-        db.query(Source)
+        db.query(Source.id, Source.url, Source.title)
         .filter(Source.project_id == project_id)
         .all()
     )
 
-    return [
+    payload = [
         {
             "id": s.id,
             "url": s.url,
@@ -205,17 +439,13 @@ def get_sources(project_id: int, db: Session = Depends(get_db)):
         }
         for s in sources
     ]
+    return JSONResponse(payload, headers={"ETag": etag})
 
 
 
 @router.get("/{project_id}/ieee")
 def get_ieee_report(project_id: int, db: Session = Depends(get_db)):
-    ieee = (
-        db.query(IEEEReport)
-        .filter(IEEEReport.project_id == project_id)
-        .order_by(desc(IEEEReport.id))
-        .first()
-    )
+    ieee = ReportRepository.latest_ieee(db, project_id)
 
     if not ieee:
         raise HTTPException(status_code=404, detail="IEEE report not found")
@@ -230,30 +460,21 @@ def get_ieee_report(project_id: int, db: Session = Depends(get_db)):
 
 @router.delete("/{project_id}")
 def delete_project(project_id: int, db: Session = Depends(get_db)):
-    project = db.query(ResearchProject).filter(ResearchProject.id == project_id).first()
+    # Set-based deletes in one transaction, then indexes, exports and caches
+    deleted = ProjectService.delete_projects(db, [project_id])
 
-    if not project:
+    if not deleted:
         raise HTTPException(status_code=404, detail="Project not found")
 
+    return {"status": "deleted", "project_id": project_id}
 
-    # Delete child tables first
-
-
-    # Delete Reports
-    reports = db.query(Report).filter(Report.project_id == project_id).all()
-    for r in reports:
-        db.query(ReportSection).filter(ReportSection.report_id == r.id).delete()
-
-    db.query(Report).filter(Report.project_id == project_id).delete()
-
-    # Delete Sources
-    db.query(Source).filter(Source.project_id == project_id).delete()
-
-    # Delete IEEE
-    db.query(IEEEReport).filter(IEEEReport.project_id == project_id).delete()
 
-    # Delete Project
-    db.delete(project)
-    db.commit()
+@router.post("/bulk_delete")
+def bulk_delete_projects(payload: ProjectBulkDelete, db: Session = Depends(get_db)):
+    deleted = ProjectService.delete_projects(db, payload.ids)
 
-    return {"status": "deleted", "project_id": project_id}
+    return {
+        "status": "deleted",
+        "project_ids": deleted,
+        "missing": sorted(set(payload.ids) - set(deleted))
+    }
@@ -1,3 +1,5 @@
+import json
+import os
 from urllib.parse import quote_plus
 
 DB_NAME = "autoresearch_pro"
@@ -9,3 +11,122 @@ DB_PORT = "3306"
 ENCODED_PASSWORD = quote_plus(DB_PASSWORD)
 
 DATABASE_URL = f"mysql+pymysql://{DB_USER}:{ENCODED_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
+
+
+# SCRAPING
+SCRAPE_MAX_WORKERS = int(os.getenv("SCRAPE_MAX_WORKERS", "8"))
+SCRAPE_PER_HOST_LIMIT = int(os.getenv("SCRAPE_PER_HOST_LIMIT", "5"))
+SCRAPE_DEADLINE_SECONDS = float(os.getenv("SCRAPE_DEADLINE_SECONDS", "40"))
+
+# LLM
+# Comma-separated Ollama servers, requests go to the one with the fewest in flight
+OLLAMA_ENDPOINTS = [
+    url.strip().rstrip("/")
+    for url in os.getenv("OLLAMA_ENDPOINTS", "http://localhost:11434").split(",")
+    if url.strip()
+]
+
+# How long Ollama keeps a model loaded after a request, and whether startup preloads it
+OLLAMA_KEEP_ALIVE = os.getenv("OLLAMA_KEEP_ALIVE", "30m")
+OLLAMA_WARMUP = os.getenv("OLLAMA_WARMUP", "1") == "1"
+
+# Keep in step with the Ollama servers' OLLAMA_NUM_PARALLEL
+LLM_MAX_IN_FLIGHT = int(os.getenv(
+    "LLM_MAX_IN_FLIGHT",
+    str(int(os.getenv("OLLAMA_NUM_PARALLEL", "4")) * len(OLLAMA_ENDPOINTS)),
+))
+
+# Model and options per task; LLM_ROUTES='{"ieee": {"model": "qwen2.5:1.5b"}}' overrides entries
+_DEFAULT_LLM_OPTIONS = {"temperature": 0.4, "top_p": 0.9, "num_ctx": 2048}
+LLM_ROUTES = {
+    "section": {"model": "qwen2.5:0.5b", "options": dict(_DEFAULT_LLM_OPTIONS)},
+    "ieee": {"model": "qwen2.5:0.5b", "options": dict(_DEFAULT_LLM_OPTIONS)},
+    "qa": {"model": "qwen2.5:0.5b", "options": dict(_DEFAULT_LLM_OPTIONS)},
+}
+for _task, _route in json.loads(os.getenv("LLM_ROUTES", "{}")).items():
+    LLM_ROUTES.setdefault(_task, {"model": "qwen2.5:0.5b", "options": dict(_DEFAULT_LLM_OPTIONS)})
+    LLM_ROUTES[_task]["model"] = _route.get("model", LLM_ROUTES[_task]["model"])
+    LLM_ROUTES[_task]["options"].update(_route.get("options", {}))
+
+# Partial section text is written to the DB every N tokens or M ms, whichever comes first
+STREAM_PERSIST_EVERY_TOKENS = int(os.getenv("STREAM_PERSIST_EVERY_TOKENS", "64"))
+STREAM_PERSIST_INTERVAL_MS = int(os.getenv("STREAM_PERSIST_INTERVAL_MS", "1500"))
+
+# REPORT POLLING
+LONG_POLL_MAX_SECONDS = int(os.getenv("LONG_POLL_MAX_SECONDS", "25"))
+
+# RETRIEVAL
+EMBED_MODEL_NAME = os.getenv("EMBED_MODEL_NAME", "all-MiniLM-L6-v2")
+EMBED_BATCH_SIZE = int(os.getenv("EMBED_BATCH_SIZE", "64"))
+RETRIEVAL_TOP_K = int(os.getenv("RETRIEVAL_TOP_K", "3"))
+VECTOR_INDEX_DIR = os.getenv("VECTOR_INDEX_DIR", os.path.join("data", "indexes"))
+VECTOR_INDEX_CACHE_SIZE = int(os.getenv("VECTOR_INDEX_CACHE_SIZE", "16"))
+
+# Q&A
+QA_TOP_K_SECTIONS = int(os.getenv("QA_TOP_K_SECTIONS", "2"))
+QA_TOP_K_CHUNKS = int(os.getenv("QA_TOP_K_CHUNKS", "3"))
+QA_CONTEXT_TOKENS = int(os.getenv("QA_CONTEXT_TOKENS", "1000"))
+QA_CACHE_MAX_ENTRIES = int(os.getenv("QA_CACHE_MAX_ENTRIES", "1000"))
+QA_CACHE_TTL_SECONDS = float(os.getenv("QA_CACHE_TTL_SECONDS", "86400"))
+# Cosine similarity for reusing an answer to a reworded question, 0 disables
+QA_CACHE_SEMANTIC_THRESHOLD = float(os.getenv("QA_CACHE_SEMANTIC_THRESHOLD", "0.95"))
+
+# LLM RESPONSE CACHE ("" = off, "memory", "sqlite" or "mysql")
+LLM_CACHE_BACKEND = os.getenv("LLM_CACHE_BACKEND", "")
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "2000"))
+LLM_CACHE_TTL_SECONDS = float(os.getenv("LLM_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+LLM_CACHE_SQLITE_PATH = os.getenv("LLM_CACHE_SQLITE_PATH", os.path.join("data", "llm_cache.sqlite3"))
+
+# BACKGROUND JOBS
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+# Running jobs refresh heartbeat_at this often; a job whose heartbeat is older
+# than JOB_STALE_SECONDS lost its process and is put back in the queue
+JOB_HEARTBEAT_SECONDS = float(os.getenv("JOB_HEARTBEAT_SECONDS", "15"))
+JOB_STALE_SECONDS = float(os.getenv("JOB_STALE_SECONDS", "120"))
+
+# HTTP CLIENT
+HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "50"))
+HTTP_MAX_KEEPALIVE = int(os.getenv("HTTP_MAX_KEEPALIVE", "20"))
+HTTP_KEEPALIVE_EXPIRY = float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "30"))
+HTTP_RETRIES = int(os.getenv("HTTP_RETRIES", "2"))
+HTTP_BACKOFF_SECONDS = float(os.getenv("HTTP_BACKOFF_SECONDS", "0.5"))
+HTTP_USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AutoResearchBot/1.0"
+
+# SCRAPE CACHE (shared across projects)
+SCRAPE_CACHE_ENABLED = os.getenv("SCRAPE_CACHE_ENABLED", "1") == "1"
+SCRAPE_CACHE_TTL_SECONDS = float(os.getenv("SCRAPE_CACHE_TTL_SECONDS", str(24 * 3600)))
+SCRAPE_CACHE_MAX_ENTRIES = int(os.getenv("SCRAPE_CACHE_MAX_ENTRIES", "5000"))
+SCRAPE_CACHE_MAX_BYTES = int(os.getenv("SCRAPE_CACHE_MAX_BYTES", str(200 * 1024 * 1024)))
+
+# "wiki-api" pulls plaintext extracts from the MediaWiki API, "html" scrapes every page
+SOURCE_MODE = os.getenv("SOURCE_MODE", "wiki-api")
+
+# HTML EXTRACTION ("auto", "selectolax", "lxml" or "bs4")
+HTML_EXTRACTOR = os.getenv("HTML_EXTRACTOR", "auto")
+# Parse pages while downloading and stop once enough text is collected
+HTML_STREAMING = os.getenv("HTML_STREAMING", "1") == "1"
+HTML_MAX_BYTES = int(os.getenv("HTML_MAX_BYTES", str(3 * 1024 * 1024)))
+
+# CHUNKING (tokens)
+CHUNK_MAX_TOKENS = int(os.getenv("CHUNK_MAX_TOKENS", "300"))
+CHUNK_OVERLAP_TOKENS = int(os.getenv("CHUNK_OVERLAP_TOKENS", "40"))
+CHUNK_MIN_TOKENS = int(os.getenv("CHUNK_MIN_TOKENS", "60"))
+# Reference text per section prompt, leaves room for the answer in num_ctx 2048
+SECTION_CONTEXT_TOKENS = int(os.getenv("SECTION_CONTEXT_TOKENS", "1000"))
+
+# NEAR-DUPLICATE CHUNKS (MinHash + LSH)
+DEDUP_ENABLED = os.getenv("DEDUP_ENABLED", "1") == "1"
+DEDUP_NUM_PERM = int(os.getenv("DEDUP_NUM_PERM", "128"))
+DEDUP_BANDS = int(os.getenv("DEDUP_BANDS", "32"))
+DEDUP_THRESHOLD = float(os.getenv("DEDUP_THRESHOLD", "0.8"))
+DEDUP_SHINGLE_SIZE = int(os.getenv("DEDUP_SHINGLE_SIZE", "3"))
+
+# EXPORTS (PDF / DOCX, cached by report id + content hash)
+EXPORT_DIR = os.getenv("EXPORT_DIR", os.path.join("data", "exports"))
+EXPORT_CACHE_MAX_BYTES = int(os.getenv("EXPORT_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+# Recently served files are never evicted, so a download in progress keeps its file
+EXPORT_MIN_AGE_SECONDS = int(os.getenv("EXPORT_MIN_AGE_SECONDS", "300"))
+
+# LISTS
+PROJECTS_PAGE_SIZE = int(os.getenv("PROJECTS_PAGE_SIZE", "50"))
+PROJECTS_PAGE_MAX = int(os.getenv("PROJECTS_PAGE_MAX", "200"))
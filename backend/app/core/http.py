@@ -0,0 +1,135 @@
+import asyncio
+import random
+import threading
+import time
+from contextlib import contextmanager
+
+import httpx
+
+from app.core.config import (
+    HTTP_MAX_CONNECTIONS,
+    HTTP_MAX_KEEPALIVE,
+    HTTP_KEEPALIVE_EXPIRY,
+    HTTP_RETRIES,
+    HTTP_BACKOFF_SECONDS,
+    HTTP_USER_AGENT,
+)
+
+# Connection-level failures where the request never reached the server's handler
+RETRY_EXCEPTIONS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.RemoteProtocolError, httpx.PoolTimeout)
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+_client = None
+_async_client = None
+_lock = threading.Lock()
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def _client_kwargs() -> dict:
+    return {
+        "limits": httpx.Limits(
+            max_connections=HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=HTTP_MAX_KEEPALIVE,
+            keepalive_expiry=HTTP_KEEPALIVE_EXPIRY,
+        ),
+        "http2": _http2_available(),
+        "follow_redirects": True,
+        "headers": {"User-Agent": HTTP_USER_AGENT},
+        "timeout": httpx.Timeout(30.0, connect=10.0),
+    }
+
+
+def get_client() -> httpx.Client:
+    """
+    Process-wide pooled client for worker threads. Thread-safe, keeps
+    connections alive between calls.
+    """
+    global _client
+    if _client is None:
+        with _lock:
+            if _client is None:
+                _client = httpx.Client(**_client_kwargs())
+    return _client
+
+
+def get_async_client() -> httpx.AsyncClient:
+    """
+    Pooled client for async route handlers. Bound to the server's event
+    loop, closed on shutdown.
+    """
+    global _async_client
+    if _async_client is None:
+        _async_client = httpx.AsyncClient(**_client_kwargs())
+    return _async_client
+
+
+def _backoff(attempt: int) -> float:
+    return HTTP_BACKOFF_SECONDS * (2 ** attempt) * (0.5 + random.random())
+
+
+def request(method: str, url: str, retries: int = HTTP_RETRIES, **kwargs) -> httpx.Response:
+    for attempt in range(retries + 1):
+        try:
+            r = get_client().request(method, url, **kwargs)
+        except RETRY_EXCEPTIONS:
+            if attempt == retries:
+                raise
+        else:
+            if r.status_code not in RETRY_STATUSES or attempt == retries:
+                return r
+        time.sleep(_backoff(attempt))
+
+
+@contextmanager
+def stream(method: str, url: str, retries: int = HTTP_RETRIES, **kwargs):
+    """
+    Streaming request with the same retry policy. Retries only happen
+    before the response is handed to the caller.
+    """
+    handed_over = False
+    for attempt in range(retries + 1):
+        try:
+            with get_client().stream(method, url, **kwargs) as r:
+                if r.status_code not in RETRY_STATUSES or attempt == retries:
+                    handed_over = True
+                    yield r
+                    return
+        except RETRY_EXCEPTIONS:
+            if attempt == retries or handed_over:
+                raise
+        time.sleep(_backoff(attempt))
+
+
+async def arequest(method: str, url: str, retries: int = HTTP_RETRIES, **kwargs) -> httpx.Response:
+    for attempt in range(retries + 1):
+        try:
+            r = await get_async_client().request(method, url, **kwargs)
+        except RETRY_EXCEPTIONS:
+            if attempt == retries:
+                raise
+        else:
+            if r.status_code not in RETRY_STATUSES or attempt == retries:
+                return r
+        await asyncio.sleep(_backoff(attempt))
+
+
+def close_client():
+    global _client
+    with _lock:
+        client, _client = _client, None
+    if client:
+        client.close()
+
+
+async def close_async_client():
+    global _async_client
+    client, _async_client = _async_client, None
+    if client:
+        await client.aclose()
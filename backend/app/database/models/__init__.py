@@ -4,3 +4,6 @@ from .chunk import Chunk
 from .report import Report
 from .report_section import ReportSection
 from .ieee_report import IEEEReport
+from .llm_cache import LLMResponseCache
+from .crawl_job import CrawlJob, CrawlStatus
+from .page_cache import PageCache
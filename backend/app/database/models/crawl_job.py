@@ -0,0 +1,36 @@
+import enum
+
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Boolean
+from sqlalchemy.sql import func
+from app.database.base import Base
+
+
+class CrawlStatus(str, enum.Enum):
+    pending = "pending"
+    running = "running"
+    success = "success"
+    failed = "failed"
+
+
+class CrawlJob(Base):
+    __tablename__ = "crawl_jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    project_id = Column(Integer, ForeignKey("research_projects.id", ondelete="CASCADE"), index=True)
+    report_id = Column(Integer, nullable=True)
+
+    status = Column(String(20), default=CrawlStatus.pending.value, index=True)
+    progress = Column(Integer, default=0)
+    current_step = Column(String(255), nullable=True)
+    error_message = Column(Text, nullable=True)
+
+    # Re-run a finished report, regenerating only sections whose inputs changed
+    refresh = Column(Boolean, nullable=False, default=False, server_default="0")
+
+    created_at = Column(DateTime, server_default=func.now())
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+
+    # Process running the job ("host:pid") and its last sign of life
+    owner = Column(String(100), nullable=True)
+    heartbeat_at = Column(DateTime, nullable=True)
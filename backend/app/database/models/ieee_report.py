@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Index
 from sqlalchemy.sql import func
 from app.database.base import Base
 
@@ -6,9 +6,17 @@ class IEEEReport(Base):
     __tablename__ = "ieee_reports"
 
     id = Column(Integer, primary_key=True, index=True)
-    project_id = Column(Integer, ForeignKey("research_projects.id"), index=True)
+    project_id = Column(Integer, ForeignKey("research_projects.id", ondelete="CASCADE"), index=True)
 
     title = Column(String(255))
     full_content = Column(Text)
 
+    # content_hash of the report it was converted from, stale once that changes
+    report_hash = Column(String(64), nullable=True)
+
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    # Latest IEEE report of a project is an index seek
+    __table_args__ = (
+        Index("ix_ieee_reports_project_id_id", "project_id", id.desc()),
+    )
@@ -0,0 +1,13 @@
+from sqlalchemy import Column, String, Text, DateTime
+from sqlalchemy.sql import func
+from app.database.base import Base
+
+class LLMResponseCache(Base):
+    __tablename__ = "llm_response_cache"
+
+    # sha256 of (model, options, prompt)
+    key = Column(String(64), primary_key=True)
+    model = Column(String(100))
+    response = Column(Text)
+
+    created_at = Column(DateTime, server_default=func.now(), index=True)
@@ -0,0 +1,23 @@
+from sqlalchemy import Column, Integer, String, Text, DateTime
+from sqlalchemy.sql import func
+from app.database.base import Base
+
+class PageCache(Base):
+    __tablename__ = "page_cache"
+
+    id = Column(Integer, primary_key=True, index=True)
+
+    # sha256 of the URL, url itself is too long for a unique index on MySQL
+    url_hash = Column(String(64), unique=True, index=True, nullable=False)
+    url = Column(String(500), nullable=False)
+
+    title = Column(String(500), nullable=True)
+    content = Column(Text)
+    size = Column(Integer, default=0)
+
+    # Validators for conditional GET
+    etag = Column(String(255), nullable=True)
+    last_modified = Column(String(100), nullable=True)
+
+    fetched_at = Column(DateTime, server_default=func.now())
+    last_used_at = Column(DateTime, server_default=func.now(), index=True)
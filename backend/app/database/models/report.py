@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, ForeignKey, DateTime
+from sqlalchemy import Column, Integer, String, Text, ForeignKey, DateTime, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.database.base import Base
@@ -10,10 +10,26 @@ class Report(Base):
     title = Column(String(255))
     full_content = Column(Text)
 
-    project_id = Column(Integer, ForeignKey("research_projects.id"))
+    project_id = Column(Integer, ForeignKey("research_projects.id", ondelete="CASCADE"))
 
     created_at = Column(DateTime, server_default=func.now())
 
+    # Bumped on every visible change, backs ETags and ?since_revision= deltas
+    revision = Column(Integer, nullable=False, default=0, server_default="0")
+
+    # sha256 of full_content, set together with revision
+    content_hash = Column(String(64), nullable=True)
+
+    # PROGRESS TRACKING
+    progress = Column(Integer, default=0)
+    status = Column(String(50), default="idle")
+    current_step = Column(String(255), nullable=True)
+
     # Relationships
     project = relationship("ResearchProject", back_populates="reports")
     sections = relationship("ReportSection", back_populates="report", cascade="all, delete-orphan")
+
+    # "Latest report of a project" is an index seek instead of a sort
+    __table_args__ = (
+        Index("ix_reports_project_id_id", "project_id", id.desc()),
+    )
@@ -6,11 +6,18 @@ class ReportSection(Base):
     __tablename__ = "report_sections"
 
     id = Column(Integer, primary_key=True, index=True)
-    report_id = Column(Integer, ForeignKey("reports.id"), index=True)
+    report_id = Column(Integer, ForeignKey("reports.id", ondelete="CASCADE"), index=True)
 
     title = Column(String(255), index=True)
     content = Column(Text)
     order = Column(Integer)
 
+    # Report revision in which this section last changed
+    revision = Column(Integer, nullable=False, default=0, server_default="0")
+
+    # sha256 of model, options, prompt and chunk ids that produced the content;
+    # unchanged fingerprints are reused on refresh instead of regenerated
+    fingerprint = Column(String(64), nullable=True)
+
     # Relationship
     report = relationship("Report", back_populates="sections")
@@ -9,7 +9,7 @@ class ResearchProject(Base):
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String(255), nullable=False)
     description = Column(Text, nullable=True)
-    created_at = Column(DateTime, server_default=func.now())
+    created_at = Column(DateTime, server_default=func.now(), index=True)
 
     # Relationships
     sources = relationship("Source", back_populates="project", cascade="all, delete-orphan")
@@ -10,7 +10,7 @@ class Source(Base):
     title = Column(String(500), nullable=True)
     content = Column(Text, nullable=True)
 
-    project_id = Column(Integer, ForeignKey("research_projects.id"))
+    project_id = Column(Integer, ForeignKey("research_projects.id", ondelete="CASCADE"))
 
     # Relationships
     project = relationship("ResearchProject", back_populates="sources")
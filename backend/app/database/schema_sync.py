@@ -0,0 +1,46 @@
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Engine
+
+from app.database.base import Base
+
+
+def sync_schema(engine: Engine):
+    """
+    create_all() only creates missing tables. This also adds columns and
+    indexes that were declared on the models after their table already
+    existed, so existing databases pick them up without manual ALTERs.
+    """
+    Base.metadata.create_all(bind=engine)
+
+    inspector = inspect(engine)
+    existing_tables = set(inspector.get_table_names())
+
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            if table.name not in existing_tables:
+                continue
+
+            existing_columns = {c["name"] for c in inspector.get_columns(table.name)}
+
+            for column in table.columns:
+                if column.name in existing_columns:
+                    continue
+
+                ddl = f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column.type.compile(dialect=engine.dialect)}"
+
+                if column.server_default is not None:
+                    ddl += f" DEFAULT {column.server_default.arg}"
+                    if not column.nullable:
+                        ddl += " NOT NULL"
+
+                print(" Adding column:", f"{table.name}.{column.name}")
+                conn.execute(text(ddl))
+
+            existing_indexes = {i["name"] for i in inspector.get_indexes(table.name)}
+
+            for index in table.indexes:
+                if index.name in existing_indexes:
+                    continue
+
+                print(" Adding index:", f"{table.name}.{index.name}")
+                index.create(bind=conn)
@@ -1,36 +1,225 @@
-import requests
-from typing import List
+import asyncio
+import json
+import threading
+from contextlib import contextmanager
+from typing import List, Iterator, Optional
+
+import httpx
+
+from app.core import http
+from app.core.config import OLLAMA_ENDPOINTS, OLLAMA_KEEP_ALIVE, LLM_ROUTES
+from app.llm.response_cache import ResponseCache, get_response_cache
+
+
+class EndpointPool:
+    """
+    Spreads requests over several Ollama servers: each call leases the
+    endpoint with the fewest requests in flight (ties go round-robin).
+    """
+
+    def __init__(self, endpoints: List[str]):
+        self.endpoints = list(endpoints)
+        self.in_flight = {url: 0 for url in self.endpoints}
+        self._next = 0
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def lease(self):
+        with self._lock:
+            order = self.endpoints[self._next:] + self.endpoints[:self._next]
+            url = min(order, key=self.in_flight.__getitem__)
+            self._next = (self.endpoints.index(url) + 1) % len(self.endpoints)
+            self.in_flight[url] += 1
+        try:
+            yield url
+        finally:
+            with self._lock:
+                self.in_flight[url] -= 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return dict(self.in_flight)
+
+
+ollama_endpoints = EndpointPool(OLLAMA_ENDPOINTS)
 
 
 class OllamaClient:
-    def __init__(self, model="qwen2.5:0.5b"):
+    def __init__(
+        self,
+        model="qwen2.5:0.5b",
+        cache: Optional[ResponseCache] = None,
+        options: Optional[dict] = None,
+        keep_alive: str = OLLAMA_KEEP_ALIVE,
+        endpoints: Optional[EndpointPool] = None,
+    ):
         self.model = model
-        self.url = "http://localhost:11434/api/generate"
+        self.options = options if options is not None else {
+            "temperature": 0.4,
+            "top_p": 0.9,
+            "num_ctx": 2048
+        }
+        self.keep_alive = keep_alive
+        self.endpoints = endpoints or ollama_endpoints
 
-    def generate(self, prompt: str) -> str:
-        payload = {
+        # Opt-in: shared cache when LLM_CACHE_BACKEND is configured
+        self.cache = cache if cache is not None else get_response_cache()
+
+    @classmethod
+    def for_task(cls, task: str, cache: Optional[ResponseCache] = None) -> "OllamaClient":
+        # Model and options come from the LLM_ROUTES table
+        route = LLM_ROUTES[task]
+        return cls(model=route["model"], cache=cache, options=dict(route["options"]))
+
+    def _payload(self, prompt: str, stream: bool) -> dict:
+        return {
             "model": self.model,
             "prompt": prompt,
-            "stream": False,
-            "options": {
-                "temperature": 0.4,
-                "top_p": 0.9,
-                "num_ctx": 2048
-            }
+            "stream": stream,
+            "options": self.options,
+            "keep_alive": self.keep_alive
         }
 
+    def _cache_key(self, prompt: str) -> str:
+        return ResponseCache.make_key(self.model, self.options, prompt)
+
+    @staticmethod
+    def _usable(response, min_cache_chars: int) -> bool:
+        # Outputs the caller would reject are neither cached nor served from cache
+        return response is not None and len(response.strip()) >= max(min_cache_chars, 1)
+
+    def generate(self, prompt: str, bypass_cache: bool = False, min_cache_chars: int = 0) -> str:
+        key = self._cache_key(prompt) if self.cache else None
+        if key and not bypass_cache:
+            cached = self.cache.get(key)
+            if self._usable(cached, min_cache_chars):
+                return cached
+
+        payload = self._payload(prompt, stream=False)
+
         # Increased timeout for safety (per section)
-        r = requests.post(self.url, json=payload, timeout=180)
+        with self.endpoints.lease() as base_url:
+            r = http.request("POST", f"{base_url}/api/generate", json=payload, timeout=180)
         r.raise_for_status()
 
         data = r.json()
-        return data.get("response", "")
+        response = data.get("response", "")
+
+        # Fresh output also refreshes the cached entry
+        if key and self._usable(response, min_cache_chars):
+            self.cache.set(key, self.model, response)
+
+        return response
+
+    async def agenerate(self, prompt: str, bypass_cache: bool = False, min_cache_chars: int = 0) -> str:
+        """
+        Same as generate(), for async handlers: waits on the event loop
+        instead of holding a worker thread.
+        """
+        key = self._cache_key(prompt) if self.cache else None
+        if key and not bypass_cache:
+            cached = await asyncio.to_thread(self.cache.get, key)
+            if self._usable(cached, min_cache_chars):
+                return cached
+
+        payload = self._payload(prompt, stream=False)
+
+        with self.endpoints.lease() as base_url:
+            r = await http.arequest("POST", f"{base_url}/api/generate", json=payload, timeout=180)
+        r.raise_for_status()
+
+        response = r.json().get("response", "")
+
+        if key and self._usable(response, min_cache_chars):
+            await asyncio.to_thread(self.cache.set, key, self.model, response)
+
+        return response
+
+    def generate_stream(self, prompt: str, bypass_cache: bool = False, min_cache_chars: int = 0) -> Iterator[str]:
+        """
+        Yields response tokens as Ollama produces them (NDJSON stream).
+        A cache hit is yielded as a single token.
+        """
+        key = self._cache_key(prompt) if self.cache else None
+        if key and not bypass_cache:
+            cached = self.cache.get(key)
+            if self._usable(cached, min_cache_chars):
+                yield cached
+                return
+
+        payload = self._payload(prompt, stream=True)
+        tokens = []
+        completed = False
+
+        # Read timeout applies per token, not to the whole generation
+        timeout = httpx.Timeout(180, connect=10)
+        with self.endpoints.lease() as base_url, \
+                http.get_client().stream("POST", f"{base_url}/api/generate", json=payload, timeout=timeout) as r:
+            r.raise_for_status()
+
+            for line in r.iter_lines():
+                if not line:
+                    continue
+
+                data = json.loads(line)
+                if data.get("error"):
+                    raise RuntimeError(data["error"])
+
+                token = data.get("response", "")
+                if token:
+                    tokens.append(token)
+                    yield token
+
+                if data.get("done"):
+                    completed = True
+                    break
+
+        # Only complete generations are cached
+        response = "".join(tokens)
+        if key and completed and self._usable(response, min_cache_chars):
+            self.cache.set(key, self.model, response)
 
     def embed(self, text: str) -> List[float]:
-        r = requests.post(
-            "http://localhost:11434/api/embeddings",
-            json={"model": self.model, "prompt": text},
-            timeout=120
-        )
+        with self.endpoints.lease() as base_url:
+            r = http.request(
+                "POST",
+                f"{base_url}/api/embeddings",
+                json={"model": self.model, "prompt": text, "keep_alive": self.keep_alive},
+                timeout=120
+            )
         r.raise_for_status()
         return r.json()["embedding"]
+
+
+async def awarm_up_models():
+    """
+    Loads every routed model on every endpoint (an empty prompt only loads
+    the model), so the first real request doesn't pay the load time. Each
+    distinct (model, options) pair is sent with its options: a runner loaded
+    at the default num_ctx would be reloaded by the first routed request.
+    """
+    routes = {
+        (route["model"], json.dumps(route["options"], sort_keys=True)): route
+        for route in LLM_ROUTES.values()
+    }
+
+    async def load(base_url: str, route: dict):
+        model, options = route["model"], route["options"]
+        try:
+            r = await http.arequest(
+                "POST",
+                f"{base_url}/api/generate",
+                json={"model": model, "prompt": "", "options": options, "keep_alive": OLLAMA_KEEP_ALIVE},
+                timeout=300,
+            )
+            r.raise_for_status()
+            print(f" Warmed up {model} (num_ctx={options.get('num_ctx')}) on {base_url}")
+        except Exception as e:
+            print(f" Warm-up of {model} on {base_url} failed: {e}")
+
+    async def warm_endpoint(base_url: str):
+        # One at a time per server, pairs of one model would evict each other's runner
+        for route in routes.values():
+            await load(base_url, route)
+
+    await asyncio.gather(*(warm_endpoint(url) for url in ollama_endpoints.endpoints))
@@ -0,0 +1,232 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Optional
+
+from app.core.config import (
+    LLM_CACHE_BACKEND,
+    LLM_CACHE_MAX_ENTRIES,
+    LLM_CACHE_TTL_SECONDS,
+    LLM_CACHE_SQLITE_PATH,
+)
+
+
+class MemoryCacheBackend:
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            stored_at, value = entry
+            if time.time() - stored_at > self.ttl_seconds:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, model: str, value: str):
+        with self._lock:
+            self._entries[key] = (time.time(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+class SQLiteCacheBackend:
+    def __init__(self, path: str, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._writes = 0
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS llm_cache ("
+            "key TEXT PRIMARY KEY, model TEXT, response TEXT, created_at REAL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS ix_llm_cache_created_at ON llm_cache (created_at)")
+        self._conn.commit()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response FROM llm_cache WHERE key = ? AND created_at > ?",
+                (key, time.time() - self.ttl_seconds),
+            ).fetchone()
+        return row[0] if row else None
+
+    def set(self, key: str, model: str, value: str):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, model, response, created_at) VALUES (?, ?, ?, ?)",
+                (key, model, value, time.time()),
+            )
+
+            # Trim to size every so often rather than on every write
+            self._writes += 1
+            if self._writes % 100 == 0:
+                self._conn.execute(
+                    "DELETE FROM llm_cache WHERE key NOT IN "
+                    "(SELECT key FROM llm_cache ORDER BY created_at DESC LIMIT ?)",
+                    (self.max_entries,),
+                )
+            self._conn.commit()
+
+
+class SQLAlchemyCacheBackend:
+    """
+    Stores entries in the app database (llm_response_cache table), so every
+    worker process shares them.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._writes = 0
+
+    def get(self, key: str) -> Optional[str]:
+        from app.database.session import SessionLocal
+        from app.database.models import LLMResponseCache
+
+        db = SessionLocal()
+        try:
+            cutoff = datetime.utcnow() - timedelta(seconds=self.ttl_seconds)
+            row = (
+                db.query(LLMResponseCache.response)
+                .filter(LLMResponseCache.key == key, LLMResponseCache.created_at > cutoff)
+                .first()
+            )
+            return row.response if row else None
+        finally:
+            db.close()
+
+    def set(self, key: str, model: str, value: str):
+        from app.database.session import SessionLocal
+        from app.database.models import LLMResponseCache
+
+        db = SessionLocal()
+        try:
+            db.merge(LLMResponseCache(key=key, model=model, response=value, created_at=datetime.utcnow()))
+            db.commit()
+
+            # Trim to size every so often rather than on every write
+            with self._lock:
+                self._writes += 1
+                trim = self._writes % 100 == 0
+            if trim:
+                self._trim(db)
+        finally:
+            db.close()
+
+    def _trim(self, db):
+        from app.database.models import LLMResponseCache
+
+        # Expired rows first, then everything older than the newest max_entries.
+        # MySQL has no LIMIT inside IN (...), so find the cutoff timestamp instead
+        cutoff = datetime.utcnow() - timedelta(seconds=self.ttl_seconds)
+        db.query(LLMResponseCache).filter(LLMResponseCache.created_at <= cutoff).delete(synchronize_session=False)
+
+        oldest_kept = (
+            db.query(LLMResponseCache.created_at)
+            .order_by(LLMResponseCache.created_at.desc())
+            .offset(self.max_entries - 1)
+            .limit(1)
+            .scalar()
+        )
+        if oldest_kept is not None:
+            db.query(LLMResponseCache).filter(
+                LLMResponseCache.created_at < oldest_kept
+            ).delete(synchronize_session=False)
+
+        db.commit()
+
+
+class ResponseCache:
+    """
+    Content-addressed cache of LLM responses: identical (model, options,
+    prompt) returns the stored response instead of calling the model.
+    """
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(model: str, options: dict, prompt: str) -> str:
+        raw = json.dumps({"model": model, "options": options, "prompt": prompt}, sort_keys=True)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        try:
+            value = self.backend.get(key)
+        except Exception as e:
+            print(" LLM cache read failed:", e)
+            value = None
+
+        with self._lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return value
+
+    def set(self, key: str, model: str, value: str):
+        try:
+            self.backend.set(key, model, value)
+        except Exception as e:
+            print(" LLM cache write failed:", e)
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "backend": type(self.backend).__name__,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": (self.hits / total) if total else 0.0,
+            }
+
+
+def build_response_cache(kind: str) -> Optional[ResponseCache]:
+    if not kind:
+        return None
+    if kind == "memory":
+        return ResponseCache(MemoryCacheBackend(LLM_CACHE_MAX_ENTRIES, LLM_CACHE_TTL_SECONDS))
+    if kind == "sqlite":
+        return ResponseCache(SQLiteCacheBackend(LLM_CACHE_SQLITE_PATH, LLM_CACHE_MAX_ENTRIES, LLM_CACHE_TTL_SECONDS))
+    if kind == "mysql":
+        return ResponseCache(SQLAlchemyCacheBackend(LLM_CACHE_MAX_ENTRIES, LLM_CACHE_TTL_SECONDS))
+    raise ValueError(f"Unknown LLM cache backend: {kind}")
+
+
+_response_cache = None
+_response_cache_lock = threading.Lock()
+
+
+def get_response_cache() -> Optional[ResponseCache]:
+    # Shared by every OllamaClient, None unless LLM_CACHE_BACKEND is set
+    global _response_cache
+    if _response_cache is None and LLM_CACHE_BACKEND:
+        with _response_cache_lock:
+            if _response_cache is None:
+                _response_cache = build_response_cache(LLM_CACHE_BACKEND)
+    return _response_cache
@@ -0,0 +1,64 @@
+import queue
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Iterator, List, Optional, Tuple, Any
+
+from app.core.config import LLM_MAX_IN_FLIGHT
+
+
+def run_bounded(
+    func: Callable[[Any], Any],
+    items: List[Any],
+    limit: int = LLM_MAX_IN_FLIGHT,
+) -> Iterator[Tuple[int, Any, Optional[Exception]]]:
+    """
+    Runs func(item) for every item with at most `limit` calls in flight.
+    Yields (index, result, error) in completion order; exactly one of
+    result/error is set. The caller's thread does all the consuming, so it
+    is safe to touch the DB session inside the loop.
+    """
+    if not items:
+        return
+
+    with ThreadPoolExecutor(max_workers=max(1, min(limit, len(items)))) as pool:
+        futures = {pool.submit(func, item): i for i, item in enumerate(items)}
+        for future in as_completed(futures):
+            idx = futures[future]
+            try:
+                yield idx, future.result(), None
+            except Exception as e:
+                yield idx, None, e
+
+
+def stream_bounded(
+    func: Callable[[Any, Callable[[Any], None]], Any],
+    items: List[Any],
+    limit: int = LLM_MAX_IN_FLIGHT,
+) -> Iterator[Tuple[int, str, Any]]:
+    """
+    Like run_bounded, but func(item, emit) may call emit(payload) while it
+    runs. Yields (index, kind, payload) where kind is "emit" for every
+    emitted payload, then "done" with the return value or "error" with the
+    exception.
+    """
+    if not items:
+        return
+
+    events = queue.Queue()
+
+    def run(idx, item):
+        try:
+            result = func(item, lambda payload: events.put((idx, "emit", payload)))
+            events.put((idx, "done", result))
+        except Exception as e:
+            events.put((idx, "error", e))
+
+    with ThreadPoolExecutor(max_workers=max(1, min(limit, len(items)))) as pool:
+        for i, item in enumerate(items):
+            pool.submit(run, i, item)
+
+        remaining = len(items)
+        while remaining:
+            idx, kind, payload = events.get()
+            if kind != "emit":
+                remaining -= 1
+            yield idx, kind, payload
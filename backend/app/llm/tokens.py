@@ -0,0 +1,60 @@
+import re
+import threading
+
+# Token math for prompt budgeting. Uses tiktoken's BPE when it is installed,
+# otherwise a regex estimate (words and punctuation, long words split up).
+
+_TOKEN_RE = re.compile(r"\w+|[^\w\s]")
+
+_encoding = None
+_encoding_loaded = False
+_lock = threading.Lock()
+
+
+def _get_encoding():
+    global _encoding, _encoding_loaded
+    if not _encoding_loaded:
+        with _lock:
+            if not _encoding_loaded:
+                try:
+                    import tiktoken
+                    _encoding = tiktoken.get_encoding("cl100k_base")
+                except Exception:
+                    _encoding = None
+                _encoding_loaded = True
+    return _encoding
+
+
+def _estimate(text: str) -> int:
+    return sum(1 + len(m) // 8 for m in _TOKEN_RE.findall(text))
+
+
+def count_tokens(text: str) -> int:
+    enc = _get_encoding()
+    if enc is not None:
+        return len(enc.encode_ordinary(text))
+    return _estimate(text)
+
+
+def count_tokens_batch(texts: list) -> list:
+    enc = _get_encoding()
+    if enc is not None:
+        return [len(ids) for ids in enc.encode_ordinary_batch(texts)]
+    return [_estimate(t) for t in texts]
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    if max_tokens <= 0:
+        return ""
+
+    enc = _get_encoding()
+    if enc is not None:
+        ids = enc.encode_ordinary(text)
+        return text if len(ids) <= max_tokens else enc.decode(ids[:max_tokens])
+
+    used = 0
+    for m in _TOKEN_RE.finditer(text):
+        used += 1 + len(m.group()) // 8
+        if used > max_tokens:
+            return text[:m.start()].rstrip()
+    return text
@@ -1,16 +1,40 @@
+import asyncio
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.database.session import engine
-from app.database.base import Base
+from app.database.schema_sync import sync_schema
+from app.llm.response_cache import get_response_cache
+from app.llm.ollama_client import awarm_up_models, ollama_endpoints
+from app.core.config import OLLAMA_WARMUP
+from app.services.job_service import JobService
+from app.core.http import close_client, close_async_client
 
 #  IMPORT YOUR ROUTER
 from app.api.project_routes import router as project_router
 
-# Create tables
-Base.metadata.create_all(bind=engine)
+# Create tables (and any columns added since)
+sync_schema(engine)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Load the routed models in the background, startup doesn't wait for Ollama
+    warmup = asyncio.create_task(awarm_up_models()) if OLLAMA_WARMUP else None
+
+    # Background report jobs (resumes anything queued before a restart)
+    JobService.start()
+    yield
+    JobService.shutdown()
+    if warmup and not warmup.done():
+        warmup.cancel()
+    await close_async_client()
+    close_client()
+
 
-app = FastAPI(title="AutoResearch Pro")
+app = FastAPI(title="AutoResearch Pro", lifespan=lifespan)
 
 # CORS
 app.add_middleware(
@@ -19,6 +43,8 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Read by the frontend: project list paging
+    expose_headers=["X-Next-Cursor"],
 )
 
 # ✅ REGISTER ROUTER
@@ -27,3 +53,15 @@ app.include_router(project_router)
 @app.get("/")
 def root():
     return {"status": "AutoResearch Pro backend running"}
+
+
+@app.get("/llm/cache")
+def llm_cache_stats():
+    cache = get_response_cache()
+    return cache.stats() if cache else {"backend": None}
+
+
+@app.get("/llm/endpoints")
+def llm_endpoint_stats():
+    # Requests currently in flight per Ollama endpoint
+    return ollama_endpoints.stats()
@@ -1,30 +1,179 @@
+from sqlalchemy import or_
 from sqlalchemy.orm import Session
-from datetime import datetime
+from datetime import datetime, timedelta
 from app.database import models
 
 
+ACTIVE_STATUSES = [models.CrawlStatus.pending.value, models.CrawlStatus.running.value]
+
+
 class CrawlRepository:
 
     @staticmethod
-    def create_job(db: Session, project_id: int):
+    def create_job(db: Session, project_id: int, refresh: bool = False):
         job = models.CrawlJob(
             project_id=project_id,
+            refresh=refresh,
             status=models.CrawlStatus.pending.value,
-            started_at=datetime.utcnow(),
         )
         db.add(job)
         db.commit()
         db.refresh(job)
         return job
 
+    @staticmethod
+    def create_job_unless_active(db: Session, project_id: int, refresh: bool = False):
+        """
+        Returns (job, created): the project's pending or running job, or a new
+        one. The project row is locked (SELECT ... FOR UPDATE) across the check
+        and the insert, so concurrent requests in any worker process queue a
+        single job.
+        """
+        # Fresh transaction: the check below must not read an older snapshot
+        db.commit()
+
+        (
+            db.query(models.ResearchProject.id)
+            .filter(models.ResearchProject.id == project_id)
+            .with_for_update()
+            .first()
+        )
+
+        active = CrawlRepository.get_active_for_project(db, project_id)
+        if active:
+            db.commit()
+            return active, False
+
+        # Commits, which releases the lock
+        return CrawlRepository.create_job(db, project_id, refresh=refresh), True
+
+    @staticmethod
+    def get(db: Session, job_id: int):
+        return db.query(models.CrawlJob).filter(models.CrawlJob.id == job_id).first()
+
+    @staticmethod
+    def get_latest_for_project(db: Session, project_id: int):
+        return (
+            db.query(models.CrawlJob)
+            .filter(models.CrawlJob.project_id == project_id)
+            .order_by(models.CrawlJob.id.desc())
+            .first()
+        )
+
+    @staticmethod
+    def get_active_for_project(db: Session, project_id: int):
+        return (
+            db.query(models.CrawlJob)
+            .filter(
+                models.CrawlJob.project_id == project_id,
+                models.CrawlJob.status.in_(ACTIVE_STATUSES),
+            )
+            .order_by(models.CrawlJob.id.desc())
+            .first()
+        )
+
+    @staticmethod
+    def list_unfinished(db: Session):
+        return (
+            db.query(models.CrawlJob)
+            .filter(models.CrawlJob.status.in_(ACTIVE_STATUSES))
+            .order_by(models.CrawlJob.id)
+            .all()
+        )
+
+    @staticmethod
+    def claim(db: Session, job_id: int, owner: str) -> bool:
+        # Atomic pending -> running, so a job never runs twice
+        now = datetime.utcnow()
+        claimed = (
+            db.query(models.CrawlJob)
+            .filter(
+                models.CrawlJob.id == job_id,
+                models.CrawlJob.status == models.CrawlStatus.pending.value,
+            )
+            .update(
+                {
+                    models.CrawlJob.status: models.CrawlStatus.running.value,
+                    models.CrawlJob.started_at: now,
+                    models.CrawlJob.owner: owner,
+                    models.CrawlJob.heartbeat_at: now,
+                },
+                synchronize_session=False,
+            )
+        )
+        db.commit()
+        return claimed == 1
+
+    @staticmethod
+    def heartbeat(db: Session, owner: str) -> int:
+        count = (
+            db.query(models.CrawlJob)
+            .filter(
+                models.CrawlJob.status == models.CrawlStatus.running.value,
+                models.CrawlJob.owner == owner,
+            )
+            .update({models.CrawlJob.heartbeat_at: datetime.utcnow()}, synchronize_session=False)
+        )
+        db.commit()
+        return count
+
+    @staticmethod
+    def requeue_stale(db: Session, stale_seconds: float) -> list:
+        """
+        Running jobs whose process stopped sending heartbeats go back to the
+        queue. Jobs of live processes, including sibling workers, are left
+        alone. Returns the requeued ids.
+        """
+        cutoff = datetime.utcnow() - timedelta(seconds=stale_seconds)
+        stale = (
+            models.CrawlJob.status == models.CrawlStatus.running.value,
+            or_(models.CrawlJob.heartbeat_at.is_(None), models.CrawlJob.heartbeat_at < cutoff),
+        )
+
+        job_ids = [row.id for row in db.query(models.CrawlJob.id).filter(*stale)]
+        if not job_ids:
+            return []
+
+        (
+            db.query(models.CrawlJob)
+            .filter(models.CrawlJob.id.in_(job_ids), *stale)
+            .update(
+                {
+                    models.CrawlJob.status: models.CrawlStatus.pending.value,
+                    models.CrawlJob.owner: None,
+                },
+                synchronize_session=False,
+            )
+        )
+        db.commit()
+        return job_ids
+
+    @staticmethod
+    def update_progress(db: Session, job_id: int, progress: int, current_step: str = None, report_id: int = None):
+        job = CrawlRepository.get(db, job_id)
+        if not job:
+            return None
+
+        job.progress = progress
+        if current_step:
+            job.current_step = current_step
+        if report_id:
+            job.report_id = report_id
+
+        db.commit()
+        return job
+
     @staticmethod
     def update_status(db: Session, job_id: int, status: models.CrawlStatus, error_message=None):
-        job = db.query(models.CrawlJob).filter(models.CrawlJob.id == job_id).first()
+        job = CrawlRepository.get(db, job_id)
         if not job:
             return None
 
         job.status = status.value
 
+        if status == models.CrawlStatus.running and not job.started_at:
+            job.started_at = datetime.utcnow()
+
         if status in [models.CrawlStatus.success, models.CrawlStatus.failed]:
             job.finished_at = datetime.utcnow()
 
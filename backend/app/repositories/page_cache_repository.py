@@ -0,0 +1,71 @@
+import hashlib
+from datetime import datetime
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from app.database import models
+
+
+def url_hash(url: str) -> str:
+    return hashlib.sha256(url.encode("utf-8")).hexdigest()
+
+
+class PageCacheRepository:
+
+    @staticmethod
+    def get(db: Session, url: str):
+        return db.query(models.PageCache).filter(models.PageCache.url_hash == url_hash(url)).first()
+
+    @staticmethod
+    def upsert(db: Session, url: str, title: str, content: str, etag: str = None, last_modified: str = None):
+        now = datetime.utcnow()
+        entry = PageCacheRepository.get(db, url)
+        if not entry:
+            entry = models.PageCache(url_hash=url_hash(url), url=url[:500])
+            db.add(entry)
+
+        entry.title = title[:500] if title else None
+        entry.content = content
+        entry.size = len(content.encode("utf-8"))
+        entry.etag = etag
+        entry.last_modified = last_modified
+        entry.fetched_at = now
+        entry.last_used_at = now
+
+        db.commit()
+        return entry
+
+    @staticmethod
+    def touch(db: Session, entry, revalidated: bool = False):
+        now = datetime.utcnow()
+        entry.last_used_at = now
+        if revalidated:
+            entry.fetched_at = now
+        db.commit()
+
+    @staticmethod
+    def evict(db: Session, max_entries: int, max_bytes: int) -> int:
+        """
+        Drops least recently used pages until both bounds hold.
+        """
+        count, total = db.query(func.count(models.PageCache.id), func.sum(models.PageCache.size)).one()
+        if count <= max_entries and (total or 0) <= max_bytes:
+            return 0
+
+        keep_bytes = 0
+        evict_ids = []
+        rows = (
+            db.query(models.PageCache.id, models.PageCache.size)
+            .order_by(models.PageCache.last_used_at.desc())
+            .all()
+        )
+        for i, (page_id, size) in enumerate(rows):
+            keep_bytes += size or 0
+            if i >= max_entries or keep_bytes > max_bytes:
+                evict_ids.append(page_id)
+
+        if evict_ids:
+            db.query(models.PageCache).filter(models.PageCache.id.in_(evict_ids)).delete(synchronize_session=False)
+            db.commit()
+
+        return len(evict_ids)
@@ -1,3 +1,6 @@
+from datetime import datetime
+
+from sqlalchemy import and_, or_, select
 from sqlalchemy.orm import Session
 from app.database import models
 
@@ -20,5 +23,75 @@ class ProjectRepository:
         return db.query(models.ResearchProject).filter(models.ResearchProject.id == project_id).first()
 
     @staticmethod
-    def list(db: Session):
-        return db.query(models.ResearchProject).order_by(models.ResearchProject.created_at.desc()).all()
+    def list(db: Session, limit: int = None, after: tuple = None):
+        """
+        Newest first. `after` is the (created_at, id) of the last project on the
+        previous page, so every page is an index range scan instead of an OFFSET.
+        """
+        Project = models.ResearchProject
+        query = db.query(Project)
+
+        if after:
+            created_at, project_id = after
+            query = query.filter(or_(
+                Project.created_at < created_at,
+                and_(Project.created_at == created_at, Project.id < project_id),
+            ))
+
+        query = query.order_by(Project.created_at.desc(), Project.id.desc())
+        if limit:
+            query = query.limit(limit)
+        return query.all()
+
+    @staticmethod
+    def encode_cursor(project) -> str:
+        return f"{project.created_at.isoformat()}~{project.id}"
+
+    @staticmethod
+    def decode_cursor(cursor: str) -> tuple:
+        created_at, _, project_id = cursor.rpartition("~")
+        return datetime.fromisoformat(created_at), int(project_id)
+
+    @staticmethod
+    def delete_many(db: Session, project_ids: list):
+        """
+        Deletes projects and everything under them with one set-based DELETE
+        per table, children first, in a single transaction. Works whether or
+        not the database was created with ON DELETE CASCADE.
+
+        Returns (deleted project ids, their report ids) for cache cleanup.
+        """
+        Project = models.ResearchProject
+        project_ids = [
+            project_id for (project_id,) in
+            db.query(Project.id).filter(Project.id.in_(project_ids))
+        ]
+        if not project_ids:
+            return [], []
+
+        report_ids = [
+            report_id for (report_id,) in
+            db.query(models.Report.id).filter(models.Report.project_id.in_(project_ids))
+        ]
+        source_ids = select(models.Source.id).where(models.Source.project_id.in_(project_ids))
+
+        try:
+            db.query(models.ReportSection).filter(
+                models.ReportSection.report_id.in_(report_ids)
+            ).delete(synchronize_session=False)
+
+            db.query(models.Chunk).filter(
+                models.Chunk.source_id.in_(source_ids)
+            ).delete(synchronize_session=False)
+
+            for model in (models.Report, models.Source, models.IEEEReport, models.CrawlJob):
+                db.query(model).filter(model.project_id.in_(project_ids)).delete(synchronize_session=False)
+
+            db.query(Project).filter(Project.id.in_(project_ids)).delete(synchronize_session=False)
+            db.commit()
+
+        except Exception:
+            db.rollback()
+            raise
+
+        return project_ids, report_ids
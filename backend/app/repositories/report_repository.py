@@ -0,0 +1,141 @@
+from sqlalchemy import desc, func
+from sqlalchemy.orm import Session, load_only
+from app.database import models
+
+
+# Everything but the full_content blob
+REPORT_META_COLUMNS = (
+    models.Report.id,
+    models.Report.title,
+    models.Report.project_id,
+    models.Report.created_at,
+    models.Report.revision,
+    models.Report.content_hash,
+    models.Report.progress,
+    models.Report.status,
+    models.Report.current_step,
+)
+
+# Session.info key for the per-session "latest report id" memo
+_LATEST_MEMO = "latest_report_ids"
+
+
+class ReportRepository:
+
+    @staticmethod
+    def latest_id(db: Session, project_id: int):
+        """
+        Id of the project's newest report, looked up once per session (so once
+        per request) through the (project_id, id) index.
+        """
+        memo = db.info.setdefault(_LATEST_MEMO, {})
+        if project_id not in memo:
+            memo[project_id] = (
+                db.query(models.Report.id)
+                .filter(models.Report.project_id == project_id)
+                .order_by(desc(models.Report.id))
+                .limit(1)
+                .scalar()
+            )
+        return memo[project_id]
+
+    @staticmethod
+    def remember_latest(db: Session, project_id: int, report_id: int):
+        db.info.setdefault(_LATEST_MEMO, {})[project_id] = report_id
+
+    @staticmethod
+    def forget_latest(db: Session, project_id: int = None):
+        memo = db.info.setdefault(_LATEST_MEMO, {})
+        if project_id is None:
+            memo.clear()
+        else:
+            memo.pop(project_id, None)
+
+    @staticmethod
+    def latest(db: Session, project_id: int, with_content: bool = True):
+        """
+        The project's newest report. Without content only the metadata columns
+        are loaded; touching full_content later lazy-loads it. Objects already
+        in the session are returned without a query.
+        """
+        report_id = ReportRepository.latest_id(db, project_id)
+        if report_id is None:
+            return None
+        options = [] if with_content else [load_only(*REPORT_META_COLUMNS)]
+        return db.get(models.Report, report_id, options=options)
+
+    @staticmethod
+    def head(db: Session, project_id: int, *columns):
+        """
+        Fresh values of a few columns of the newest report, by primary key.
+        """
+        report_id = ReportRepository.latest_id(db, project_id)
+        if report_id is None:
+            return None
+        return db.query(*columns).filter(models.Report.id == report_id).first()
+
+    @staticmethod
+    def latest_sections(db: Session, project_id: int):
+        """
+        (report_id, sections in order) of the newest report in one joined
+        query, or None when the project has no report.
+        """
+        memo = db.info.get(_LATEST_MEMO, {})
+        if project_id in memo:
+            if memo[project_id] is None:
+                return None
+            latest = memo[project_id]
+        else:
+            latest = (
+                db.query(func.max(models.Report.id))
+                .filter(models.Report.project_id == project_id)
+                .scalar_subquery()
+            )
+
+        rows = (
+            db.query(models.Report.id, models.ReportSection)
+            .outerjoin(models.ReportSection, models.ReportSection.report_id == models.Report.id)
+            .filter(models.Report.id == latest)
+            .order_by(models.ReportSection.order)
+            .all()
+        )
+        if not rows:
+            return None
+        return rows[0][0], [section for _, section in rows if section is not None]
+
+    @staticmethod
+    def summary(db: Session, project_id: int):
+        """
+        Metadata of the newest report plus content length and section count,
+        computed in the database so full_content never leaves it.
+        """
+        section_count = (
+            db.query(func.count(models.ReportSection.id))
+            .filter(models.ReportSection.report_id == models.Report.id)
+            .correlate(models.Report)
+            .scalar_subquery()
+        )
+
+        return (
+            db.query(
+                *REPORT_META_COLUMNS,
+                func.coalesce(func.length(models.Report.full_content), 0).label("length"),
+                section_count.label("section_count"),
+            )
+            .filter(models.Report.project_id == project_id)
+            .order_by(desc(models.Report.id))
+            .first()
+        )
+
+    @staticmethod
+    def latest_ieee(db: Session, project_id: int, with_content: bool = True):
+        query = db.query(models.IEEEReport).filter(models.IEEEReport.project_id == project_id)
+        if not with_content:
+            query = query.options(load_only(
+                models.IEEEReport.id,
+                models.IEEEReport.title,
+                models.IEEEReport.project_id,
+                models.IEEEReport.report_hash,
+                models.IEEEReport.created_at,
+            ))
+        return query.order_by(desc(models.IEEEReport.id)).first()
@@ -1,6 +1,11 @@
+from sqlalchemy import insert
 from sqlalchemy.orm import Session
 from app.database import models
 
+# Rows per multi-row INSERT, keeps statements well under max_allowed_packet
+INSERT_BATCH_SIZE = 500
+
+
 class SourceRepository:
     @staticmethod
     def create(db: Session, project_id: int, url: str):
@@ -12,3 +17,113 @@ class SourceRepository:
         db.commit()
         db.refresh(source)
         return source
+
+    @staticmethod
+    def get_ingested(db: Session, project_id: int):
+        """
+        Sources already stored for a project, so re-runs keep their chunk ids.
+
+        Returns {url: (source_id, [(chunk_id, chunk_text), ...])} in ingest order,
+        the oldest source wins when a URL was stored more than once.
+        """
+        sources = {}
+        for source_id, url in (
+            db.query(models.Source.id, models.Source.url)
+            .filter(models.Source.project_id == project_id)
+            .order_by(models.Source.id)
+        ):
+            if url not in sources:
+                sources[url] = (source_id, [])
+
+        by_id = {source_id: chunks for source_id, chunks in sources.values()}
+        if by_id:
+            for source_id, chunk_id, content in (
+                db.query(models.Chunk.source_id, models.Chunk.id, models.Chunk.content)
+                .filter(models.Chunk.source_id.in_(list(by_id)))
+                .order_by(models.Chunk.source_id, models.Chunk.chunk_index)
+            ):
+                by_id[source_id].append((chunk_id, content))
+
+        return sources
+
+    @staticmethod
+    def bulk_ingest(db: Session, project_id: int, pages: list):
+        """
+        Writes every Source and Chunk for a report in one transaction.
+
+        pages: [(url, title, content, [chunk_text, ...]), ...]
+        Returns [(source_id, url, [(chunk_id, chunk_text), ...]), ...] in input order.
+        """
+        if not pages:
+            return []
+
+        try:
+            source_ids = SourceRepository._insert_rows(
+                db,
+                models.Source.__table__,
+                [
+                    {"project_id": project_id, "url": url, "title": title, "content": content}
+                    for url, title, content, _ in pages
+                ],
+                models.Source.project_id == project_id,
+            )
+
+            chunk_rows = [
+                {"source_id": source_id, "page_url": url, "content": text, "chunk_index": i}
+                for source_id, (url, _, _, chunks) in zip(source_ids, pages)
+                for i, text in enumerate(chunks)
+            ]
+            chunk_ids = SourceRepository._insert_rows(
+                db,
+                models.Chunk.__table__,
+                chunk_rows,
+                models.Chunk.source_id.in_(source_ids),
+            )
+
+            db.commit()
+
+        except Exception:
+            db.rollback()
+            raise
+
+        result = []
+        position = 0
+        for source_id, (url, _, _, chunks) in zip(source_ids, pages):
+            ids = chunk_ids[position:position + len(chunks)]
+            result.append((source_id, url, list(zip(ids, chunks))))
+            position += len(chunks)
+
+        return result
+
+    @staticmethod
+    def _insert_rows(db: Session, table, rows: list, scope) -> list:
+        """
+        Multi-row INSERTs that return the new primary keys in row order.
+        """
+        ids = []
+        dialect = db.get_bind().dialect
+
+        for start in range(0, len(rows), INSERT_BATCH_SIZE):
+            batch = rows[start:start + INSERT_BATCH_SIZE]
+
+            if getattr(dialect, "insert_executemany_returning_sort_by_parameter_order", False):
+                result = db.execute(
+                    insert(table).returning(table.c.id, sort_by_parameter_order=True),
+                    batch,
+                )
+                ids.extend(row.id for row in result)
+                continue
+
+            # MySQL has no RETURNING: LAST_INSERT_ID() is the first row's id and
+            # ids grow in row order, so read them back from there
+            result = db.execute(insert(table).values(batch))
+            first_id = result.lastrowid
+            ids.extend(
+                row.id
+                for row in db.query(table.c.id)
+                .filter(scope, table.c.id >= first_id)
+                .order_by(table.c.id)
+                .limit(len(batch))
+            )
+
+        return ids
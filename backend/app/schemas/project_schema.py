@@ -1,7 +1,11 @@
 from pydantic import BaseModel
-from typing import Optional
+from typing import List, Optional
 
 
 class ProjectCreate(BaseModel):
     title: str
     description: Optional[str] = None
+
+
+class ProjectBulkDelete(BaseModel):
+    ids: List[int]
@@ -0,0 +1,82 @@
+import re
+
+from app.core.config import CHUNK_MAX_TOKENS, CHUNK_OVERLAP_TOKENS, CHUNK_MIN_TOKENS
+from app.llm.tokens import count_tokens_batch
+
+# Split after . ! ? when the next sentence starts with a capital, digit or quote
+_SENTENCE_RE = re.compile(r"(?<=[.!?])\s+(?=[\"'(\[]?[A-Z0-9])")
+
+
+class Chunker:
+    """
+    Packs whole sentences into chunks of at most `max_tokens`, repeating
+    up to `overlap_tokens` of trailing sentences at the start of the next
+    chunk. Sentences longer than a chunk are split on words.
+    """
+
+    def __init__(
+        self,
+        max_tokens: int = CHUNK_MAX_TOKENS,
+        overlap_tokens: int = CHUNK_OVERLAP_TOKENS,
+        min_tokens: int = CHUNK_MIN_TOKENS,
+    ):
+        self.max_tokens = max_tokens
+        self.overlap_tokens = min(overlap_tokens, max_tokens // 2)
+        self.min_tokens = min_tokens
+
+    def split_sentences(self, text: str) -> list:
+        return [s for s in _SENTENCE_RE.split(" ".join(text.split())) if s]
+
+    def chunk(self, text: str) -> list:
+        return self.chunk_many([text])[0]
+
+    def chunk_many(self, texts: list) -> list:
+        # Count every sentence of every page in one batch call
+        per_text = [self._fit(self.split_sentences(t)) for t in texts]
+        flat = [s for sentences in per_text for s in sentences]
+        counts = count_tokens_batch(flat) if flat else []
+
+        results = []
+        offset = 0
+        for sentences in per_text:
+            results.append(self._pack(sentences, counts[offset:offset + len(sentences)]))
+            offset += len(sentences)
+        return results
+
+    def _fit(self, sentences: list) -> list:
+        # Break up run-on "sentences" (tables, lists) so each fits in a chunk
+        max_words = max(1, int(self.max_tokens * 0.7))
+        out = []
+        for s in sentences:
+            words = s.split(" ")
+            if len(words) <= max_words:
+                out.append(s)
+            else:
+                out.extend(" ".join(words[i:i + max_words]) for i in range(0, len(words), max_words))
+        return out
+
+    def _pack(self, sentences: list, counts: list) -> list:
+        chunks = []
+        start = 0
+        n = len(sentences)
+
+        while start < n:
+            end, used = start, 0
+            while end < n and (used + counts[end] <= self.max_tokens or end == start):
+                used += counts[end]
+                end += 1
+
+            if used >= self.min_tokens or not chunks:
+                chunks.append(" ".join(sentences[start:end]))
+
+            if end >= n:
+                break
+
+            # Step back over trailing sentences for overlap, always moving forward
+            next_start, overlap = end, 0
+            while next_start - 1 > start and overlap + counts[next_start - 1] <= self.overlap_tokens:
+                next_start -= 1
+                overlap += counts[next_start]
+            start = next_start
+
+        return [c for c in chunks if c]
@@ -0,0 +1,102 @@
+import re
+import zlib
+
+import numpy as np
+
+from app.core.config import DEDUP_NUM_PERM, DEDUP_BANDS, DEDUP_THRESHOLD, DEDUP_SHINGLE_SIZE
+
+_WORD_RE = re.compile(r"\w+")
+
+# Mersenne prime for the universal hash family h(x) = (a*x + b) mod p
+_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+
+
+class MinHashDeduper:
+    """
+    Drops near-duplicate texts with MinHash signatures and banded LSH.
+
+    Candidates sharing any band are compared on their full signatures and a
+    text is dropped when its estimated Jaccard similarity to an already kept
+    text reaches `threshold`. The first occurrence always wins.
+    """
+
+    def __init__(
+        self,
+        num_perm: int = DEDUP_NUM_PERM,
+        bands: int = DEDUP_BANDS,
+        threshold: float = DEDUP_THRESHOLD,
+        shingle_size: int = DEDUP_SHINGLE_SIZE,
+        seed: int = 1,
+    ):
+        if num_perm % bands:
+            raise ValueError("num_perm must be divisible by bands")
+
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.threshold = threshold
+        self.shingle_size = shingle_size
+
+        rng = np.random.RandomState(seed)
+        self._a = rng.randint(1, 1 << 31, size=num_perm).astype(np.uint64)
+        self._b = rng.randint(0, 1 << 31, size=num_perm).astype(np.uint64)
+
+    def _shingles(self, text: str) -> np.ndarray:
+        words = _WORD_RE.findall(text.lower())
+        k = self.shingle_size
+        if len(words) < k:
+            grams = [" ".join(words)] if words else []
+        else:
+            grams = {" ".join(words[i:i + k]) for i in range(len(words) - k + 1)}
+        return np.fromiter((zlib.crc32(g.encode("utf-8")) for g in grams), dtype=np.uint64)
+
+    def signature(self, text: str) -> np.ndarray:
+        shingles = self._shingles(text)
+        if shingles.size == 0:
+            return np.full(self.num_perm, _MAX_HASH, dtype=np.uint64)
+
+        # (num_perm, n_shingles) hash table, min over shingles per permutation
+        hashed = (np.outer(self._a, shingles) + self._b[:, None]) % _PRIME
+        return (hashed & _MAX_HASH).min(axis=1)
+
+    def keep_mask(self, texts: list) -> list:
+        """
+        Returns one bool per text: True to keep, False for near-duplicates.
+        """
+        buckets = [dict() for _ in range(self.bands)]
+        kept_signatures = []
+        mask = []
+
+        for text in texts:
+            sig = self.signature(text)
+            keys = [sig[i * self.rows:(i + 1) * self.rows].tobytes() for i in range(self.bands)]
+
+            candidates = set()
+            for band, key in zip(buckets, keys):
+                candidates.update(band.get(key, ()))
+
+            duplicate = any(
+                np.mean(kept_signatures[c] == sig) >= self.threshold
+                for c in candidates
+            )
+            mask.append(not duplicate)
+            if duplicate:
+                continue
+
+            position = len(kept_signatures)
+            kept_signatures.append(sig)
+            for band, key in zip(buckets, keys):
+                band.setdefault(key, []).append(position)
+
+        return mask
+
+    def dedup_pages(self, page_chunks: list) -> list:
+        """
+        Removes near-duplicate chunks across pages, keeping page order.
+
+        page_chunks: [[chunk_text, ...], ...] -> same shape, duplicates removed
+        """
+        flat = [text for chunks in page_chunks for text in chunks]
+        mask = iter(self.keep_mask(flat))
+        return [[text for text in chunks if next(mask)] for chunks in page_chunks]
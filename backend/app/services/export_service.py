@@ -1,54 +1,178 @@
+import glob
+import hashlib
 import os
-import uuid
-from reportlab.lib.pagesizes import A4
-from reportlab.pdfgen import canvas
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
 from docx import Document
 
+from app.core.config import EXPORT_DIR, EXPORT_CACHE_MAX_BYTES, EXPORT_MIN_AGE_SECONDS
+from app.services.pdf_renderer import render_pdf
+
 
 class ExportService:
+    """
+    Exports are cached on disk by (report id, content hash, format), so an
+    unchanged report is rendered once and every later download is a file
+    read. Files are written atomically; a sweeper keeps the directory under
+    EXPORT_CACHE_MAX_BYTES by evicting the least recently served files.
+    """
+
+    FORMATS = ("docx", "pdf")
+
+    _locks = {}
+    _locks_guard = threading.Lock()
+    _executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="export")
+
     @staticmethod
     def export_to_word(report):
-        filename = f"report_{uuid.uuid4().hex}.docx"
-        filepath = os.path.join("tmp", filename)
+        return ExportService.get_or_build(report, "docx")
 
-        os.makedirs("tmp", exist_ok=True)
+    @staticmethod
+    def export_to_pdf(report):
+        return ExportService.get_or_build(report, "pdf")
 
-        doc = Document()
-        doc.add_heading(report.title, 0)
+    @staticmethod
+    def cache_path(report_id: int, content_hash: str, fmt: str) -> str:
+        return os.path.join(EXPORT_DIR, f"report_{report_id}_{content_hash[:16]}.{fmt}")
 
-        for line in report.full_content.split("\n"):
-            doc.add_paragraph(line)
+    @staticmethod
+    def get_or_build(report, fmt: str) -> str:
+        return ExportService._get_or_build(
+            report.id, ExportService._content_hash(report), report.title, report.full_content or "", fmt
+        )
 
-        doc.save(filepath)
-        return filepath
+    @staticmethod
+    def prerender(report):
+        """
+        Renders every format in the background, so the first download of a
+        finished report is already a cache hit.
+        """
+        # Plain values only, the ORM object belongs to the caller's session
+        args = (report.id, ExportService._content_hash(report), report.title, report.full_content or "")
+        for fmt in ExportService.FORMATS:
+            ExportService._executor.submit(ExportService._prerender_one, *args, fmt)
 
     @staticmethod
-    def export_to_pdf(report):
-        filename = f"report_{uuid.uuid4().hex}.pdf"
-        filepath = os.path.join("tmp", filename)
+    def delete_for_report(report_id: int):
+        for path in glob.glob(os.path.join(EXPORT_DIR, f"report_{report_id}_*")):
+            ExportService._remove(path)
 
-        os.makedirs("tmp", exist_ok=True)
+    @staticmethod
+    def sweep(max_bytes: int = EXPORT_CACHE_MAX_BYTES, keep: str = None):
+        """
+        Deletes least recently served exports until the cache fits in max_bytes.
+        Files served in the last EXPORT_MIN_AGE_SECONDS are never evicted.
+        """
+        entries = []
+        for path in glob.glob(os.path.join(EXPORT_DIR, "report_*")):
+            if path.endswith(".tmp"):
+                # Render in progress
+                continue
+            try:
+                st = os.stat(path)
+            except FileNotFoundError:
+                continue
+            entries.append((st.st_mtime, st.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        now = time.time()
+        for mtime, size, path in sorted(entries):
+            if total <= max_bytes:
+                break
+            if path == keep or now - mtime < EXPORT_MIN_AGE_SECONDS:
+                continue
+            ExportService._remove(path)
+            total -= size
 
-        c = canvas.Canvas(filepath, pagesize=A4)
-        width, height = A4
+    @staticmethod
+    def _prerender_one(report_id, content_hash, title, content, fmt):
+        try:
+            ExportService._get_or_build(report_id, content_hash, title, content, fmt)
+        except Exception as e:
+            print(f" Pre-rendering {fmt} for report {report_id} failed: {e}")
 
-        x = 50
-        y = height - 50
+    @staticmethod
+    def _get_or_build(report_id, content_hash, title, content, fmt) -> str:
+        if fmt not in ExportService.FORMATS:
+            raise ValueError(f"Unknown export format: {fmt}")
 
-        c.setFont("Times-Bold", 16)
-        c.drawString(x, y, report.title)
-        y -= 40
+        path = ExportService.cache_path(report_id, content_hash, fmt)
 
-        c.setFont("Times-Roman", 11)
+        # One render per file, concurrent requests wait for it
+        with ExportService._lock_for(path):
+            if os.path.exists(path):
+                # mtime marks the last download, the sweeper evicts oldest first
+                os.utime(path)
+                return path
 
-        for line in report.full_content.split("\n"):
-            if y < 50:
-                c.showPage()
-                c.setFont("Times-Roman", 11)
-                y = height - 50
+            os.makedirs(EXPORT_DIR, exist_ok=True)
+            start = time.time()
 
-            c.drawString(x, y, line[:1000])
-            y -= 14
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            try:
+                if fmt == "docx":
+                    ExportService._render_word(title, content, tmp_path)
+                else:
+                    ExportService._render_pdf(title, content, tmp_path)
+                os.replace(tmp_path, path)
+            finally:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
 
-        c.save()
-        return filepath
+            print(f" Rendered {os.path.basename(path)} in {time.time() - start:.2f}s")
+
+        # Only after a new render: older versions of this report's export are
+        # dead weight, unless just served (a response may still be opening it)
+        now = time.time()
+        for old in glob.glob(os.path.join(EXPORT_DIR, f"report_{report_id}_*.{fmt}")):
+            if old == path:
+                continue
+            try:
+                if now - os.stat(old).st_mtime < EXPORT_MIN_AGE_SECONDS:
+                    continue
+            except FileNotFoundError:
+                continue
+            ExportService._remove(old)
+
+        ExportService.sweep(keep=path)
+        return path
+
+    @staticmethod
+    def _content_hash(report) -> str:
+        if report.content_hash:
+            return report.content_hash
+        return hashlib.sha256((report.full_content or "").encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def _lock_for(path: str) -> threading.Lock:
+        with ExportService._locks_guard:
+            lock = ExportService._locks.get(path)
+            if lock is None:
+                # Locks are tiny; prune the table once it grows
+                if len(ExportService._locks) > 1024:
+                    ExportService._locks = {p: l for p, l in ExportService._locks.items() if l.locked()}
+                lock = ExportService._locks[path] = threading.Lock()
+            return lock
+
+    @staticmethod
+    def _remove(path: str):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    @staticmethod
+    def _render_word(title: str, content: str, filepath: str):
+        doc = Document()
+        doc.add_heading(title, 0)
+
+        for line in content.split("\n"):
+            doc.add_paragraph(line)
+
+        doc.save(filepath)
+
+    @staticmethod
+    def _render_pdf(title: str, content: str, filepath: str):
+        render_pdf(title, content, filepath)
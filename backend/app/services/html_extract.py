@@ -0,0 +1,255 @@
+# Pluggable HTML -> text extraction. bs4/html.parser is the original pure
+# Python path; lxml and selectolax do the same work in C. StreamingExtractor
+# parses the page as it downloads and stops once it has enough main content.
+from app.core.config import HTML_EXTRACTOR
+
+JUNK_TAGS = ("script", "style", "noscript", "header", "footer", "nav", "form", "aside")
+BLOCK_TAGS = ("p", "li", "dd", "dt", "h2", "h3", "h4", "blockquote", "pre")
+
+
+def _clean(text: str) -> str:
+    return " ".join(text.split())
+
+
+class Bs4Extractor:
+    name = "bs4"
+
+    def extract(self, html: str, max_chars: int, root_id: str = "mw-content-text"):
+        from bs4 import BeautifulSoup
+        soup = BeautifulSoup(html, "html.parser")
+
+        # Remove junk
+        for s in soup(list(JUNK_TAGS)):
+            s.extract()
+
+        title = soup.title.string if soup.title else None
+
+        content = soup.find("div", {"id": root_id}) if root_id else soup.body
+        if not content:
+            return title, ""
+
+        return title, _clean(content.get_text(separator=" "))[:max_chars]
+
+    def paragraphs(self, html: str, max_chars: int, min_len: int = 80):
+        from bs4 import BeautifulSoup
+        soup = BeautifulSoup(html, "html.parser")
+
+        for tag in soup(list(JUNK_TAGS)):
+            tag.decompose()
+
+        paragraphs = []
+        for p in soup.find_all("p"):
+            text = p.get_text().strip()
+            if len(text) > min_len:
+                paragraphs.append(text)
+
+        return "\n\n".join(paragraphs)[:max_chars]
+
+
+class LxmlExtractor:
+    name = "lxml"
+
+    def _tree(self, html: str):
+        import lxml.html
+        from lxml import etree
+
+        tree = lxml.html.fromstring(html)
+        etree.strip_elements(tree, *JUNK_TAGS, with_tail=False)
+        return tree
+
+    def extract(self, html: str, max_chars: int, root_id: str = "mw-content-text"):
+        tree = self._tree(html)
+        title_node = tree.find(".//title")
+        title = title_node.text_content() if title_node is not None else None
+
+        content = tree.get_element_by_id(root_id, None) if root_id else tree.find(".//body")
+        if content is None:
+            return title, ""
+
+        # Stop walking text nodes once the cap is reached
+        parts, size = [], 0
+        for text in content.itertext():
+            parts.append(text)
+            size += len(text)
+            if size >= max_chars * 2:
+                break
+
+        return title, _clean(" ".join(parts))[:max_chars]
+
+    def paragraphs(self, html: str, max_chars: int, min_len: int = 80):
+        paragraphs, size = [], 0
+        for p in self._tree(html).iter("p"):
+            text = p.text_content().strip()
+            if len(text) > min_len:
+                paragraphs.append(text)
+                size += len(text) + 2
+                if size >= max_chars:
+                    break
+
+        return "\n\n".join(paragraphs)[:max_chars]
+
+
+class SelectolaxExtractor:
+    name = "selectolax"
+
+    def _tree(self, html: str):
+        from selectolax.lexbor import LexborHTMLParser
+
+        tree = LexborHTMLParser(html)
+        tree.strip_tags(list(JUNK_TAGS))
+        return tree
+
+    def extract(self, html: str, max_chars: int, root_id: str = "mw-content-text"):
+        tree = self._tree(html)
+        title_node = tree.css_first("title")
+        title = title_node.text() if title_node else None
+
+        content = tree.css_first(f"div#{root_id}") if root_id else tree.body
+        if content is None:
+            return title, ""
+
+        return title, _clean(content.text(separator=" "))[:max_chars]
+
+    def paragraphs(self, html: str, max_chars: int, min_len: int = 80):
+        paragraphs, size = [], 0
+        for p in self._tree(html).css("p"):
+            text = p.text().strip()
+            if len(text) > min_len:
+                paragraphs.append(text)
+                size += len(text) + 2
+                if size >= max_chars:
+                    break
+
+        return "\n\n".join(paragraphs)[:max_chars]
+
+
+class StreamingExtractor:
+    """
+    Incremental lxml parse of a page as bytes arrive. Collects text from
+    block elements inside the main content div and reports when it has
+    `max_chars`, so the caller can stop downloading.
+    """
+
+    def __init__(self, max_chars: int, root_id: str = "mw-content-text"):
+        from lxml import etree
+
+        self.max_chars = max_chars
+        self.root_id = root_id
+        self.parser = etree.HTMLPullParser(events=("start", "end"))
+
+        self.title = None
+        self.parts = []
+        self.size = 0
+        self.in_root = root_id is None
+        self.root_done = False
+        self.block_depth = 0
+        self.junk_depth = 0
+
+    def feed(self, data: bytes) -> bool:
+        """
+        Returns True once enough text is collected.
+        """
+        self.parser.feed(data)
+
+        for event, el in self.parser.read_events():
+            tag = el.tag if isinstance(el.tag, str) else ""
+
+            if event == "start":
+                if tag in JUNK_TAGS:
+                    self.junk_depth += 1
+                elif tag == "div" and not self.in_root and not self.root_done and el.get("id") == self.root_id:
+                    self.in_root = True
+                elif tag in BLOCK_TAGS and self.in_root:
+                    self.block_depth += 1
+                continue
+
+            if tag == "title" and self.title is None:
+                self.title = el.text
+
+            if tag in JUNK_TAGS:
+                self.junk_depth -= 1
+                el.clear(keep_tail=True)
+                continue
+
+            if tag in BLOCK_TAGS and self.in_root:
+                self.block_depth -= 1
+                # Only the outermost block, nested lists would repeat text
+                if self.block_depth == 0 and self.junk_depth == 0:
+                    text = _clean(" ".join(el.itertext()))
+                    if text:
+                        self.parts.append(text)
+                        self.size += len(text) + 1
+                    el.clear(keep_tail=True)
+            elif tag == "div" and self.in_root and el.get("id") == self.root_id:
+                self.in_root = False
+                self.root_done = True
+
+            if self.size >= self.max_chars:
+                return True
+
+        return self.root_done
+
+    def result(self):
+        return self.title, " ".join(self.parts)[:self.max_chars]
+
+
+def stream_extract(chunks, max_chars: int, max_bytes: int, root_id: str = "mw-content-text"):
+    """
+    Extracts (title, text, bytes_read) from an iterator of body chunks,
+    reading no more than needed. Falls back to buffering up to `max_bytes`
+    for the configured extractor when lxml is not installed.
+    """
+    read = 0
+
+    try:
+        extractor = StreamingExtractor(max_chars, root_id)
+    except ImportError:
+        buf = bytearray()
+        for chunk in chunks:
+            buf.extend(chunk)
+            if len(buf) >= max_bytes:
+                break
+        title, text = get_extractor().extract(buf.decode("utf-8", "replace"), max_chars, root_id)
+        return title, text, len(buf)
+
+    for chunk in chunks:
+        read += len(chunk)
+        if extractor.feed(chunk) or read >= max_bytes:
+            break
+
+    title, text = extractor.result()
+    return title, text, read
+
+
+_EXTRACTORS = {
+    "bs4": Bs4Extractor,
+    "lxml": LxmlExtractor,
+    "selectolax": SelectolaxExtractor,
+}
+
+_extractor = None
+
+
+def get_extractor(name: str = None):
+    """
+    "auto" picks the fastest installed backend: selectolax, lxml, then bs4.
+    """
+    global _extractor
+    if name is None and _extractor is not None:
+        return _extractor
+
+    choice = name or HTML_EXTRACTOR
+    if choice == "auto":
+        choice = "bs4"
+        for candidate, module in (("selectolax", "selectolax"), ("lxml", "lxml")):
+            try:
+                __import__(module)
+                choice = candidate
+                break
+            except ImportError:
+                continue
+
+    extractor = _EXTRACTORS[choice]()
+    if name is None:
+        _extractor = extractor
+    return extractor
@@ -0,0 +1,156 @@
+import os
+import socket
+import threading
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlalchemy.orm import Session
+
+from app.core.config import JOB_WORKERS, JOB_HEARTBEAT_SECONDS, JOB_STALE_SECONDS
+from app.database.models import CrawlStatus, Report
+from app.database.session import SessionLocal
+from app.repositories.crawl_repository import CrawlRepository
+from app.repositories.report_repository import ReportRepository
+from app.services.report_events import report_events
+
+
+class JobService:
+    """
+    Runs report generation on a worker pool outside the HTTP request. Jobs
+    are rows in crawl_jobs, so they survive restarts and can be queried
+    for progress.
+    """
+
+    _executor = None
+    _lock = threading.Lock()
+
+    # "host:pid" of this process on the jobs it runs, sibling workers share the DB
+    _owner = None
+    _stop = None
+
+    @staticmethod
+    def start():
+        with JobService._lock:
+            if JobService._executor is not None:
+                return
+            JobService._executor = ThreadPoolExecutor(max_workers=JOB_WORKERS, thread_name_prefix="report-job")
+            # Set here, not at import, so forked workers get their own pid
+            JobService._owner = f"{socket.gethostname()}:{os.getpid()}"
+            JobService._stop = threading.Event()
+            threading.Thread(
+                target=JobService._heartbeat_loop, args=(JobService._stop,), name="report-job-heartbeat", daemon=True
+            ).start()
+
+        # Pick up queued jobs and those whose process died; running jobs of
+        # live sibling workers keep their heartbeat and are left alone
+        db = SessionLocal()
+        try:
+            requeued = CrawlRepository.requeue_stale(db, JOB_STALE_SECONDS)
+            jobs = CrawlRepository.list_unfinished(db)
+            for job in jobs:
+                JobService._executor.submit(JobService._run, job.id)
+            if jobs:
+                print(f" Resumed {len(jobs)} queued job(s) ({len(requeued)} interrupted)")
+        finally:
+            db.close()
+
+    @staticmethod
+    def shutdown():
+        with JobService._lock:
+            executor, JobService._executor = JobService._executor, None
+            if JobService._stop is not None:
+                JobService._stop.set()
+        if executor:
+            # Unstarted jobs stay pending in the DB and resume on next start
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    @staticmethod
+    def _heartbeat_loop(stop: threading.Event):
+        while not stop.wait(JOB_HEARTBEAT_SECONDS):
+            db = SessionLocal()
+            try:
+                CrawlRepository.heartbeat(db, JobService._owner)
+
+                # A sibling worker died mid-job: take its jobs over
+                for job_id in CrawlRepository.requeue_stale(db, JOB_STALE_SECONDS):
+                    print(f" Job {job_id} lost its worker, requeued")
+                    executor = JobService._executor
+                    if executor is not None:
+                        executor.submit(JobService._run, job_id)
+            except Exception as e:
+                print(" Job heartbeat failed:", e)
+            finally:
+                db.close()
+
+    @staticmethod
+    def enqueue_report(db: Session, project_id: int, refresh: bool = False):
+        """
+        Returns (job, created). A project with a pending or running job gets
+        that job back instead of a second one, also across worker processes.
+        """
+        job, created = CrawlRepository.create_job_unless_active(db, project_id, refresh=refresh)
+        if not created:
+            return job, False
+
+        if JobService._executor is None:
+            JobService.start()
+        JobService._executor.submit(JobService._run, job.id)
+
+        return job, True
+
+    @staticmethod
+    def _run(job_id: int):
+        # Imported here to keep the service import graph acyclic
+        from app.services.report_service import ReportService
+
+        db = SessionLocal()
+        try:
+            if not CrawlRepository.claim(db, job_id, JobService._owner):
+                return
+
+            job = CrawlRepository.get(db, job_id)
+            print(f"\n Job {job_id} started for project {job.project_id}")
+
+            def on_progress(progress: int, step: str, report_id: int = None):
+                CrawlRepository.update_progress(db, job_id, progress, step, report_id)
+
+            report = ReportService(db).generate_simple_report(
+                job.project_id, on_progress=on_progress, refresh=bool(job.refresh)
+            )
+
+            CrawlRepository.update_progress(db, job_id, 100, "Done", report.id)
+            CrawlRepository.update_status(db, job_id, CrawlStatus.success)
+            print(f" Job {job_id} finished")
+
+        except Exception as e:
+            traceback.print_exc()
+            db.rollback()
+            CrawlRepository.update_status(db, job_id, CrawlStatus.failed, error_message=str(e))
+            JobService._fail_report(db, job_id, str(e))
+
+        finally:
+            db.close()
+
+    @staticmethod
+    def _fail_report(db: Session, job_id: int, error: str):
+        # A report left "generating" would look live to /stream, split and the summary
+        try:
+            job = CrawlRepository.get(db, job_id)
+            if not job:
+                return
+            report = None
+            if job.report_id:
+                report = db.get(Report, job.report_id)
+            if report is None:
+                report = ReportRepository.latest(db, job.project_id, with_content=False)
+            if report is None or report.status != "generating":
+                return
+
+            report.status = "failed"
+            report.current_step = error[:255]
+            db.commit()
+
+            report_events.publish(job.project_id, {"type": "failed", "report_id": report.id, "error": error})
+        except Exception as e:
+            db.rollback()
+            print(f" Could not mark the report of job {job_id} as failed: {e}")
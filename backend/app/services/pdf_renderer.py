@@ -0,0 +1,119 @@
+import re
+from functools import lru_cache
+from xml.sax.saxutils import escape
+
+from reportlab.lib.enums import TA_JUSTIFY
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.styles import ParagraphStyle
+from reportlab.lib.units import mm
+from reportlab.platypus import SimpleDocTemplate, Paragraph
+from reportlab.platypus.flowables import HRFlowable
+
+_HEADING_RE = re.compile(r"^(#{1,3})\s+(.*)$")
+_BULLET_RE = re.compile(r"^([-*•]|\d+[.)])\s+")
+_BOLD_RE = re.compile(r"\*\*(.+?)\*\*")
+
+MARGIN = 20 * mm
+
+
+@lru_cache(maxsize=1)
+def _styles() -> dict:
+    # Built once per process; ReportLab caches the font metrics behind them
+    body = ParagraphStyle(
+        "Body", fontName="Times-Roman", fontSize=11, leading=14.5,
+        alignment=TA_JUSTIFY, spaceAfter=6, splitLongWords=True,
+    )
+    return {
+        "title": ParagraphStyle("Title", parent=body, fontName="Times-Bold", fontSize=18, leading=22, alignment=0, spaceAfter=14),
+        "h1": ParagraphStyle("H1", parent=body, fontName="Times-Bold", fontSize=15, leading=19, alignment=0, spaceBefore=10, spaceAfter=8, keepWithNext=1),
+        "h2": ParagraphStyle("H2", parent=body, fontName="Times-Bold", fontSize=13, leading=16, alignment=0, spaceBefore=10, spaceAfter=6, keepWithNext=1),
+        "h3": ParagraphStyle("H3", parent=body, fontName="Times-BoldItalic", fontSize=11.5, leading=14.5, alignment=0, spaceBefore=6, spaceAfter=4, keepWithNext=1),
+        "body": body,
+        "bullet": ParagraphStyle("Bullet", parent=body, leftIndent=18, bulletIndent=4, spaceAfter=3),
+    }
+
+
+def _inline(text: str) -> str:
+    # Paragraph text is ReportLab markup, so escape it before adding tags
+    return _BOLD_RE.sub(r"<b>\1</b>", escape(text))
+
+
+def iter_blocks(content: str):
+    """
+    Yields (kind, text) for the report's Markdown: headings, bullets, rules and
+    paragraphs (consecutive lines joined, so wrapping is left to the layout).
+    """
+    paragraph = []
+
+    def flush():
+        if paragraph:
+            text = " ".join(paragraph)
+            paragraph.clear()
+            return ("body", text)
+        return None
+
+    for raw in content.split("\n"):
+        line = raw.strip()
+
+        heading = _HEADING_RE.match(line)
+        if not line or heading or line == "---" or _BULLET_RE.match(line):
+            block = flush()
+            if block:
+                yield block
+
+        if not line:
+            continue
+        if heading:
+            yield (f"h{len(heading.group(1))}", heading.group(2).strip())
+        elif line == "---":
+            yield ("rule", "")
+        elif _BULLET_RE.match(line):
+            yield ("bullet", line)
+        else:
+            paragraph.append(line)
+
+    block = flush()
+    if block:
+        yield block
+
+
+def build_flowables(title: str, content: str) -> list:
+    styles = _styles()
+    flowables = [Paragraph(_inline(title), styles["title"])]
+
+    for kind, text in iter_blocks(content):
+        if kind == "rule":
+            flowables.append(HRFlowable(width="100%", thickness=0.5, spaceBefore=4, spaceAfter=8))
+        elif kind == "bullet":
+            # Numbered items keep their number, the rest get a bullet
+            marker = _BULLET_RE.match(text).group(1)
+            bullet = marker if marker[0].isdigit() else "•"
+            flowables.append(Paragraph(_inline(text[len(marker):].strip()), styles["bullet"], bulletText=bullet))
+        else:
+            flowables.append(Paragraph(_inline(text), styles[kind]))
+
+    return flowables
+
+
+def _page_number(canvas, doc):
+    canvas.saveState()
+    canvas.setFont("Times-Roman", 9)
+    canvas.drawCentredString(A4[0] / 2, MARGIN / 2, str(doc.page))
+    canvas.restoreState()
+
+
+def render_pdf(title: str, content: str, filepath: str):
+    """
+    Lays the report out with platypus: wrapped, justified paragraphs that
+    split across pages, heading styles for #/##/###, and page numbers.
+    """
+    doc = SimpleDocTemplate(
+        filepath,
+        pagesize=A4,
+        leftMargin=MARGIN, rightMargin=MARGIN, topMargin=MARGIN, bottomMargin=MARGIN,
+        title=title,
+        pageCompression=1,
+    )
+
+    # build() consumes the list as pages are laid out, finished flowables are freed
+    doc.build(build_flowables(title, content), onFirstPage=_page_number, onLaterPages=_page_number)
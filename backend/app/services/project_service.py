@@ -1,6 +1,10 @@
 from sqlalchemy.orm import Session
 from app.repositories.project_repository import ProjectRepository
 from app.repositories.source_repository import SourceRepository
+from app.repositories.report_repository import ReportRepository
+from app.services.export_service import ExportService
+from app.services.qa_cache import qa_cache
+from app.services.vector_service import VectorService
 
 class ProjectService:
 
@@ -9,8 +13,36 @@ class ProjectService:
         return ProjectRepository.create(db, title, description)
 
     @staticmethod
-    def list_projects(db: Session):
-        return ProjectRepository.list(db)
+    def list_projects(db: Session, limit: int = None, cursor: str = None):
+        """
+        Returns (projects, next_cursor); next_cursor is None on the last page.
+        """
+        after = ProjectRepository.decode_cursor(cursor) if cursor else None
+
+        # One extra row tells whether another page exists
+        projects = ProjectRepository.list(db, limit=limit + 1 if limit else None, after=after)
+        if limit and len(projects) > limit:
+            projects = projects[:limit]
+            return projects, ProjectRepository.encode_cursor(projects[-1])
+        return projects, None
+
+    @staticmethod
+    def delete_projects(db: Session, project_ids: list):
+        """
+        Deletes the projects in one transaction, then their on-disk vector
+        indexes, cached exports and cached answers. Returns the ids deleted.
+        """
+        deleted, report_ids = ProjectRepository.delete_many(db, project_ids)
+
+        for project_id in deleted:
+            ReportRepository.forget_latest(db, project_id)
+            VectorService.delete_index(project_id)
+
+        for report_id in report_ids:
+            qa_cache.invalidate_report(report_id)
+            ExportService.delete_for_report(report_id)
+
+        return deleted
 
     @staticmethod
     def add_source(db: Session, project_id: int, url: str):
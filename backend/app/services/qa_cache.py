@@ -0,0 +1,94 @@
+import re
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+from app.core.config import QA_CACHE_MAX_ENTRIES, QA_CACHE_TTL_SECONDS, QA_CACHE_SEMANTIC_THRESHOLD
+
+
+def normalize_question(question: str) -> str:
+    text = " ".join(question.lower().split())
+    return re.sub(r"[\s?.!]+$", "", text)
+
+
+class QACache:
+    """
+    LRU + TTL cache of answers, keyed by (report id, content hash, question).
+    A changed report has a new content hash, so its old answers are never hit.
+    Optionally matches near-duplicate questions by embedding similarity.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float, semantic_threshold: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.semantic_threshold = semantic_threshold
+
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, report_id: int, content_hash: str, question: str):
+        key = (report_id, content_hash, normalize_question(question))
+        with self._lock:
+            result = self._lookup(key)
+            if result is not None:
+                self.hits += 1
+            return result
+
+    def get_similar(self, report_id: int, content_hash: str, vector: np.ndarray):
+        """
+        Best cached answer for this report whose question embedding is at
+        least `semantic_threshold` cosine-similar (vectors are normalized).
+        """
+        if self.semantic_threshold <= 0 or vector is None:
+            with self._lock:
+                self.misses += 1
+            return None
+
+        with self._lock:
+            best_key, best_score = None, self.semantic_threshold
+            for key, (_, _, cached_vector) in self._entries.items():
+                if key[0] != report_id or key[1] != content_hash or cached_vector is None:
+                    continue
+                score = float(np.dot(cached_vector, vector))
+                if score >= best_score:
+                    best_key, best_score = key, score
+
+            result = self._lookup(best_key) if best_key else None
+            if result is not None:
+                self.hits += 1
+            else:
+                self.misses += 1
+            return result
+
+    def put(self, report_id: int, content_hash: str, question: str, result: dict, vector: np.ndarray = None):
+        key = (report_id, content_hash, normalize_question(question))
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, result, vector)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate_report(self, report_id: int):
+        with self._lock:
+            for key in [k for k in self._entries if k[0] == report_id]:
+                del self._entries[key]
+
+    def _lookup(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        expires_at, result, _ = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+
+        self._entries.move_to_end(key)
+        return result
+
+
+qa_cache = QACache(QA_CACHE_MAX_ENTRIES, QA_CACHE_TTL_SECONDS, QA_CACHE_SEMANTIC_THRESHOLD)
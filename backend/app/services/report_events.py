@@ -0,0 +1,60 @@
+import asyncio
+import threading
+
+
+class ReportEventBus:
+    """
+    In-process fan-out of live report events (section deltas, progress,
+    completion) to SSE and long-poll subscribers, keyed by project id.
+
+    Events are published from worker threads and delivered to asyncio queues
+    on the subscriber's event loop, so waiting for them holds no thread.
+    """
+
+    def __init__(self, max_queue: int = 1000):
+        self._lock = threading.Lock()
+        self._subscribers = {}
+        self._max_queue = max_queue
+
+    def subscribe(self, project_id: int, types=None) -> asyncio.Queue:
+        """
+        Must be called from the event loop that reads the queue. With `types`
+        only those event types are delivered.
+        """
+        q = asyncio.Queue(maxsize=self._max_queue)
+        subscriber = (asyncio.get_running_loop(), q, frozenset(types) if types else None)
+        with self._lock:
+            self._subscribers.setdefault(project_id, {})[q] = subscriber
+        return q
+
+    def unsubscribe(self, project_id: int, q: asyncio.Queue):
+        with self._lock:
+            subs = self._subscribers.get(project_id)
+            if subs:
+                subs.pop(q, None)
+                if not subs:
+                    del self._subscribers[project_id]
+
+    def publish(self, project_id: int, event: dict):
+        with self._lock:
+            subs = list(self._subscribers.get(project_id, {}).values())
+
+        for loop, q, types in subs:
+            if types is not None and event.get("type") not in types:
+                continue
+            try:
+                loop.call_soon_threadsafe(self._offer, q, event)
+            except RuntimeError:
+                # Loop already closed
+                pass
+
+    @staticmethod
+    def _offer(q: asyncio.Queue, event: dict):
+        try:
+            q.put_nowait(event)
+        except asyncio.QueueFull:
+            # Slow client, it will resync from the next snapshot
+            pass
+
+
+report_events = ReportEventBus()
@@ -1,28 +1,72 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import desc
+import asyncio
+import json
 import traceback
+import hashlib
 import time
+import threading
+from collections import OrderedDict
 
-from app.database.models import Report, Source, Chunk, ResearchProject, ReportSection
+from app.database.models import Report, Chunk, ResearchProject, ReportSection
 from app.database.models import IEEEReport
 from app.llm.ollama_client import OllamaClient
+from app.llm.response_cache import ResponseCache, MemoryCacheBackend, get_response_cache
+from app.llm.scheduler import run_bounded, stream_bounded
+from app.core.config import LLM_MAX_IN_FLIGHT, STREAM_PERSIST_EVERY_TOKENS, STREAM_PERSIST_INTERVAL_MS
+from app.core.config import SOURCE_MODE, SECTION_CONTEXT_TOKENS, DEDUP_ENABLED, RETRIEVAL_TOP_K, QA_TOP_K_SECTIONS, QA_TOP_K_CHUNKS, QA_CONTEXT_TOKENS
+from app.llm.tokens import count_tokens, truncate_to_tokens
+from app.vectorstore.bm25 import BM25Index
+from app.services.qa_cache import qa_cache
+from app.vectorstore.faiss_store import get_embedding_model
+from app.services.vector_service import VectorService
+from app.services.report_events import report_events
 from app.services.web_search_service import WebSearchService, WebScraper
+from app.repositories.source_repository import SourceRepository
+from app.repositories.report_repository import ReportRepository
+from app.services.chunker import Chunker
+from app.services.dedup import MinHashDeduper
+from app.services.export_service import ExportService
+from app.core.config import LLM_CACHE_MAX_ENTRIES, LLM_CACHE_TTL_SECONDS
+
+# Shorter outputs are replaced with fallback text, so they are never cached
+SECTION_MIN_CHARS = 200
+IEEE_SECTION_MIN_CHARS = 100
+
+# Per-section IEEE conversions when no shared LLM cache is configured
+_ieee_section_cache = ResponseCache(MemoryCacheBackend(LLM_CACHE_MAX_ENTRIES, LLM_CACHE_TTL_SECONDS))
 
 
 class ReportService:
+    # BM25 over report sections, shared across requests
+    _section_index_cache = OrderedDict()
+    _section_index_lock = threading.Lock()
+
     def __init__(self, db: Session):
         self.db = db
 
-        # FAST model for everything
-        self.llm = OllamaClient(model="qwen2.5:0.5b")
+        # Model and options per task come from the LLM_ROUTES table
+        self.llm = OllamaClient.for_task("section")
+
+        # Section conversions are always memoized, in memory without a shared cache
+        self.ieee_llm = OllamaClient.for_task("ieee", cache=get_response_cache() or _ieee_section_cache)
 
-        # FAST model for IEEE (changed from 1.5b to 0.5b for speed)
-        self.ieee_llm = OllamaClient(model="qwen2.5:0.5b")
+        self.qa_llm = OllamaClient.for_task("qa")
 
-        # FAST model for Q&A
-        self.qa_llm = OllamaClient(model="qwen2.5:0.5b")
+        # Sentence-aware, token-sized chunks for both Chunk rows and embeddings
+        self.chunker = Chunker()
 
-    def generate_simple_report(self, project_id: int):
+    @staticmethod
+    def is_complete(report) -> bool:
+        # Reports written before status tracking have NULL status (the column
+        # was added without a default) and were only saved once finished
+        return report is not None and report.status in ("done", None) and bool(report.full_content)
+
+    def generate_simple_report(self, project_id: int, on_progress=None, refresh: bool = False):
+        """
+        Builds the project's report. A finished report is returned as is unless
+        `refresh` is set; refreshing (or resuming a failed run) only regenerates
+        sections whose fingerprint changed.
+        """
         project = self.db.query(ResearchProject).filter(
             ResearchProject.id == project_id
         ).first()
@@ -33,93 +77,87 @@ class ReportService:
         topic = project.title
 
         # Check for existing report
-        existing = (
-            self.db.query(Report)
-            .filter(Report.project_id == project_id)
-            .order_by(desc(Report.id))
-            .first()
-        )
+        existing = ReportRepository.latest(self.db, project_id)
 
-        if existing and existing.full_content and len(existing.full_content) > 5000:
+        if self.is_complete(existing) and not refresh:
             print("Reusing existing report")
             return existing
 
-        print("Generating NEW report for:", topic)
+        # Earlier sections by title, reused below when their inputs are unchanged
+        previous = {}
 
         if existing:
+            print("Refreshing report for:", topic)
             report = existing
-            report.full_content = " Preparing sources...\n"
-            self.db.commit()
+            qa_cache.invalidate_report(report.id)
+            for row in self.db.query(ReportSection).filter(ReportSection.report_id == report.id):
+                if row.title in previous:
+                    self.db.delete(row)
+                else:
+                    previous[row.title] = row
         else:
+            print("Generating NEW report for:", topic)
             report = Report(
                 project_id=project_id,
                 title=f"Research: {topic}",
-                full_content=" Preparing sources...\n"
+                full_content=" Preparing sources...\n",
+                revision=1
             )
             self.db.add(report)
             self.db.commit()
             self.db.refresh(report)
+            ReportRepository.remember_latest(self.db, project_id, report.id)
+
+        self._set_progress(report, 5, "Searching sources", on_progress, status="generating")
+
+        # Sources stored by earlier runs keep their chunks and ids, so unchanged
+        # sections retrieve the same chunks and keep their fingerprints
+        stored = SourceRepository.get_ingested(self.db, project_id)
+
+        # Web search (+ page text in one go in wiki-api mode)
+        pages = self._collect_pages(report, topic, on_progress)
+
+        if not pages and not stored:
+            self._save_revision(report, " No sources found")
+            self._set_progress(report, 100, "No sources found", on_progress, status="failed")
+            report_events.publish(project_id, {"type": "failed", "error": "No sources found"})
+            raise Exception("No sources found")
+
+        # Chunk every new usable page, then write all sources and chunks in one transaction
+        usable = [
+            (url, title, content) for url, title, content in pages
+            if url not in stored and content and len(content) >= 1000
+        ]
+        page_chunks = self.chunker.chunk_many([content for _, _, content in usable])
+
+        # Search results repeat the same leads and infoboxes; drop near-duplicate
+        # chunks before they are stored, embedded or put into prompts
+        if DEDUP_ENABLED and page_chunks:
+            known = [[text for _, text in chunks] for _, chunks in stored.values()]
+            before = sum(len(chunks) for chunks in page_chunks)
+            page_chunks = MinHashDeduper().dedup_pages(known + page_chunks)[len(known):]
+            print(f" Dropped {before - sum(len(chunks) for chunks in page_chunks)} near-duplicate chunks")
+        ingest = [
+            (url, title, content, chunks)
+            for (url, title, content), chunks in zip(usable, page_chunks)
+        ]
 
-        # Web search
         try:
-            urls = WebSearchService.search(topic, max_results=5)
+            ingested = SourceRepository.bulk_ingest(self.db, project_id, ingest)
         except Exception as e:
-            print(f" Web search error: {e}")
-            urls = []
-            
-        if not urls:
-            report.full_content = " No sources found"
-            self.db.commit()
-            raise Exception("No sources found")
+            print(f"⚠️ Error saving sources: {e}")
+            ingested = []
 
-        all_chunks = []
-        source_urls = []
+        print(f" Reusing {len(stored)} stored sources, ingested {len(ingested)} new")
+        ingested = [(source_id, url, chunks) for url, (source_id, chunks) in stored.items()] + ingested
 
-        # Scrape sources
-        for url in urls:
-            try:
-                title, content = WebScraper.scrape(url)
-                if not content or len(content) < 1000:
-                    continue
-
-                src = Source(
-                    project_id=project_id,
-                    url=url,
-                    title=title,
-                    content=content
-                )
-                self.db.add(src)
-                self.db.commit()
-                self.db.refresh(src)
-
-                source_urls.append(url)
-
-                words = content.split()
-                chunk_size = 350
-                chunk_index = 0
-
-                for i in range(0, len(words), chunk_size):
-                    chunk_text = " ".join(words[i:i + chunk_size])
-                    if len(chunk_text) < 300:
-                        continue
-
-                    chunk = Chunk(
-                        source_id=src.id,
-                        page_url=url,
-                        content=chunk_text,
-                        chunk_index=chunk_index
-                    )
-                    self.db.add(chunk)
-                    all_chunks.append(chunk_text)
-                    chunk_index += 1
-
-                self.db.commit()
-                
-            except Exception as e:
-                print(f"⚠️ Error scraping {url}: {e}")
-                continue
+        source_urls = [url for _, url, _ in ingested]
+        all_chunk_ids = [chunk_id for _, _, chunks in ingested for chunk_id, _ in chunks]
+        all_chunks = [text for _, _, chunks in ingested for _, text in chunks]
 
         if len(all_chunks) < 3:
+            self._set_progress(report, 100, "Too little content", on_progress, status="failed")
+            report_events.publish(project_id, {"type": "failed", "error": "Too little content"})
             raise Exception(" Too little content")
 
         print(f" Collected {len(all_chunks)} chunks")
@@ -135,80 +173,394 @@ class ReportService:
             ("Conclusion", 300),
         ]
 
-        full_text = f"# {topic}\n\n"
-        report.full_content = full_text
-        self.db.commit()
+        # Pick each section's context by similarity to the section topic
+        self._set_progress(report, 25, "Indexing sources", on_progress)
+        section_contexts = self._select_section_contexts(
+            project_id, topic, [title for title, _ in sections_plan], all_chunks, all_chunk_ids
+        )
 
-        # Generate sections
+        # Build every prompt up front so they can be dispatched together
+        section_jobs = []
+        fingerprints = []
         for idx, (section_title, target_words) in enumerate(sections_plan):
-            print(f"\n [{idx+1}/{len(sections_plan)}] {section_title}")
-            
-            # Show progress
-            full_text += f"\n## {section_title}\n\n Generating...\n"
-            report.full_content = full_text
-            self.db.commit()
-
-            # Varied context
-            chunk_start = (idx * 3) % len(all_chunks)
-            chunk_end = min(chunk_start + 4, len(all_chunks))
-            context = "\n\n".join(all_chunks[chunk_start:chunk_end])
+            context_text, context_chunk_ids = section_contexts[idx]
+            context = truncate_to_tokens(context_text, SECTION_CONTEXT_TOKENS)
 
             prompt = f"""Write a {target_words}-word section about {section_title} for a research paper on {topic}.
 
 Be concise and clear. Use this reference:
-{context[:1500]}
+{context}
 
 Write {section_title}:"""
 
-            try:
-                start = time.time()
-                section_text = self.llm.generate(prompt)
-                elapsed = time.time() - start
-                
-                print(f"   ✓ Done in {elapsed:.1f}s")
-                
-            except Exception as e:
-                print(f"   ✗ Error: {e}")
+            section_jobs.append((section_title, prompt, context))
+            fingerprints.append(self._section_fingerprint(self.llm, prompt, context_chunk_ids))
+
+        section_texts = [None] * len(section_jobs)
+        partial_texts = [""] * len(section_jobs)
+
+        def render():
+            # Always assembled in plan order, pending sections show progress
+            text = f"# {topic}\n\n"
+            for idx, (section_title, _, _) in enumerate(section_jobs):
+                body = section_texts[idx]
+                if body is None:
+                    body = partial_texts[idx] or " Generating..."
+                text += f"\n## {section_title}\n\n{body}\n"
+            return text
+
+        # Keep sections whose inputs are unchanged, regenerate the rest
+        section_rows = []
+        pending = []
+        for idx, (section_title, _, _) in enumerate(section_jobs):
+            row = previous.pop(section_title, None)
+
+            if row is not None and row.fingerprint == fingerprints[idx] and row.content:
+                section_texts[idx] = row.content
+            else:
+                if row is None:
+                    row = ReportSection(report_id=report.id, title=section_title)
+                    self.db.add(row)
+                row.content = " Generating..."
+                row.fingerprint = None
+                pending.append(idx)
+
+            row.order = idx + 1
+            section_rows.append(row)
+
+        # References are rebuilt below, titles dropped from the plan go away
+        references_row = previous.pop("References", None)
+        for row in previous.values():
+            self.db.delete(row)
+
+        full_text = render()
+        self._save_revision(report, full_text, [section_rows[i] for i in pending])
+        self._set_progress(report, 30, "Writing sections", on_progress)
+        sections_done = 0
+
+        def generate_section(job, emit):
+            _, prompt, _ = job
+            start = time.time()
+            tokens = []
+            for token in self.llm.generate_stream(prompt, min_cache_chars=SECTION_MIN_CHARS):
+                tokens.append(token)
+                emit(token)
+            return "".join(tokens), time.time() - start
+
+        # Generate sections, up to LLM_MAX_IN_FLIGHT at once, streaming tokens
+        print(f" Generating {len(pending)} sections, reusing {len(section_jobs) - len(pending)} ({LLM_MAX_IN_FLIGHT} in flight)")
+
+        tokens_since_persist = 0
+        last_persist = time.monotonic()
+        dirty = set()
+
+        for job_idx, kind, payload in stream_bounded(
+            generate_section, [section_jobs[i] for i in pending], LLM_MAX_IN_FLIGHT
+        ):
+            idx = pending[job_idx]
+            section_title, _, context = section_jobs[idx]
+            fingerprint = fingerprints[idx]
+
+            if kind == "emit":
+                partial_texts[idx] += payload
+                dirty.add(idx)
+                report_events.publish(project_id, {
+                    "type": "section_delta",
+                    "index": idx,
+                    "title": section_title,
+                    "delta": payload,
+                })
+
+                # Throttle partial writes
+                tokens_since_persist += 1
+                elapsed_ms = (time.monotonic() - last_persist) * 1000
+                if tokens_since_persist >= STREAM_PERSIST_EVERY_TOKENS or elapsed_ms >= STREAM_PERSIST_INTERVAL_MS:
+                    for i in dirty:
+                        section_rows[i].content = partial_texts[i]
+                    self._save_revision(report, render(), [section_rows[i] for i in dirty])
+                    dirty.clear()
+                    tokens_since_persist = 0
+                    last_persist = time.monotonic()
+                continue
+
+            if kind == "error":
+                print(f"   ✗ [{idx+1}/{len(section_jobs)}] {section_title}: {payload}")
                 section_text = f"{context[:1000]}"
+                fingerprint = None
+            else:
+                section_text, elapsed = payload
+                print(f"   ✓ [{idx+1}/{len(section_jobs)}] {section_title} done in {elapsed:.1f}s")
 
-            if not section_text or len(section_text.strip()) < 200:
+            if not section_text or len(section_text.strip()) < SECTION_MIN_CHARS:
+                # Neither the fallback nor the short answer is memoized, the next refresh tries again
                 section_text = f"{context[:1000]}"
+                fingerprint = None
 
             # Replace progress indicator with content
-            full_text = full_text.replace(
-                f"\n## {section_title}\n\n Generating...\n",
-                f"\n## {section_title}\n\n{section_text}\n"
+            section_texts[idx] = section_text
+            section_rows[idx].content = section_text
+            section_rows[idx].fingerprint = fingerprint
+            dirty.add(idx)
+            for i in dirty:
+                if section_texts[i] is None:
+                    section_rows[i].content = partial_texts[i]
+
+            full_text = render()
+            self._save_revision(report, full_text, [section_rows[i] for i in dirty])
+            dirty.clear()
+            tokens_since_persist = 0
+            last_persist = time.monotonic()
+
+            sections_done += 1
+            self._set_progress(
+                report,
+                30 + 65 * sections_done // len(pending),
+                f"Wrote {section_title} ({sections_done}/{len(pending)})",
+                on_progress,
             )
 
-            report.full_content = full_text
-            self.db.commit()
+            report_events.publish(project_id, {
+                "type": "section_done",
+                "index": idx,
+                "title": section_title,
+                "content": section_text,
+            })
 
         # Add references
+        references = []
         if source_urls:
-            full_text += "\n\n---\n\n## References\n\n"
-            for idx, u in enumerate(source_urls, 1):
-                full_text += f"{idx}. {u}\n"
-
-        report.full_content = full_text
-        self.db.commit()
+            references_text = "".join(f"{idx}. {u}\n" for idx, u in enumerate(source_urls, 1))
+            full_text += "\n\n---\n\n## References\n\n" + references_text
+
+            row = references_row
+            if row is None:
+                row = ReportSection(report_id=report.id, title="References")
+                self.db.add(row)
+            if row.content != references_text.strip() or row.order != len(section_rows) + 1:
+                row.content = references_text.strip()
+                row.order = len(section_rows) + 1
+                references.append(row)
+        elif references_row is not None:
+            self.db.delete(references_row)
+
+        self._save_revision(report, full_text, references)
+        self._set_progress(report, 100, "Done", on_progress, status="done")
         self.db.refresh(report)
 
+        # Render downloads now, so the first one is a cache hit
+        ExportService.prerender(report)
+
         print(f"\n Complete: {len(full_text)} chars")
 
+        report_events.publish(project_id, {
+            "type": "complete",
+            "report_id": report.id,
+            "full_content": full_text,
+        })
+
         return report
 
+    def _collect_pages(self, report, topic: str, on_progress=None):
+        """
+        Returns (url, title, content) for the topic's sources in search order.
+        """
+        pages = []
+
+        if SOURCE_MODE == "wiki-api":
+            pages = WebSearchService.search_with_extracts(topic, max_results=5)
+
+            # HTML scraping only for pages the API had no usable text for
+            missing = [url for url, _, content in pages if not content]
+            if missing:
+                self._set_progress(report, 10, f"Scraping {len(missing)} sources", on_progress)
+                scraped = {url: (title, content) for url, title, content in WebScraper.scrape_many(missing)}
+                pages = [
+                    (url, *scraped[url]) if url in scraped else (url, title, content)
+                    for url, title, content in pages
+                ]
+
+        if not pages:
+            try:
+                urls = WebSearchService.search(topic, max_results=5)
+            except Exception as e:
+                print(f" Web search error: {e}")
+                urls = []
+
+            if urls:
+                # Scrape sources (concurrently, results keep search order)
+                self._set_progress(report, 10, f"Scraping {len(urls)} sources", on_progress)
+                pages = WebScraper.scrape_many(urls)
+
+        return pages
+
+    def _select_section_contexts(self, project_id: int, topic: str, section_titles: list, all_chunks: list, all_chunk_ids: list):
+        try:
+            embedder = get_embedding_model()
+
+            # Embed only chunks the project's on-disk index doesn't have yet
+            start = time.time()
+            missing_ids = set(VectorService.missing_ids(project_id, all_chunk_ids))
+            new_chunks = [(i, text) for i, text in zip(all_chunk_ids, all_chunks) if i in missing_ids]
+            if new_chunks:
+                VectorService.add_chunks(
+                    project_id,
+                    [i for i, _ in new_chunks],
+                    embedder.embed([text for _, text in new_chunks]),
+                )
+
+            queries = embedder.embed([f"{title} of {topic}" for title in section_titles])
+            hits = VectorService.search(project_id, queries, top_k=RETRIEVAL_TOP_K)
+            print(f" Retrieved section contexts in {time.time() - start:.1f}s")
+
+            texts = dict(zip(all_chunk_ids, all_chunks))
+            missing = {chunk_id for section_hits in hits for chunk_id, _ in section_hits} - texts.keys()
+            if missing:
+                # Chunks ingested by earlier runs for this project
+                for chunk_id, content in self.db.query(Chunk.id, Chunk.content).filter(Chunk.id.in_(missing)):
+                    texts[chunk_id] = content
+
+            contexts = []
+            for section_hits in hits:
+                ids = [chunk_id for chunk_id, _ in section_hits if chunk_id in texts]
+                contexts.append(("\n\n".join(texts[chunk_id] for chunk_id in ids), ids))
+            return contexts
+
+        except Exception as e:
+            # Fall back to the rotating window if embeddings are unavailable
+            print(f" Semantic retrieval unavailable, using rotating context: {e}")
+            contexts = []
+            for idx in range(len(section_titles)):
+                chunk_start = (idx * 3) % len(all_chunks)
+                chunk_end = min(chunk_start + 4, len(all_chunks))
+                contexts.append((
+                    "\n\n".join(all_chunks[chunk_start:chunk_end]),
+                    all_chunk_ids[chunk_start:chunk_end],
+                ))
+            return contexts
+
+    @staticmethod
+    def _section_fingerprint(llm, prompt: str, chunk_ids: list) -> str:
+        payload = json.dumps([llm.model, llm.options, list(chunk_ids), prompt], sort_keys=True)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _set_progress(self, report, progress: int, step: str, on_progress=None, status: str = None):
+        report.progress = progress
+        report.current_step = step
+        if status:
+            report.status = status
+        self.db.commit()
+
+        if on_progress:
+            on_progress(progress, step, report.id)
+
+    def _save_revision(self, report, full_text: str, sections=()):
+        # Every visible change bumps the revision so pollers can use ETags and deltas
+        report.revision = (report.revision or 0) + 1
+        report.full_content = full_text
+        report.content_hash = hashlib.sha256((full_text or "").encode("utf-8")).hexdigest()
+        for section in sections:
+            section.revision = report.revision
+        self.db.commit()
+
+        report_events.publish(report.project_id, {
+            "type": "revision",
+            "report_id": report.id,
+            "revision": report.revision,
+        })
+
     def ask_from_report(self, project_id: int, question: str):
-        report = (
-            self.db.query(Report)
-            .filter(Report.project_id == project_id)
-            .order_by(desc(Report.id))
-            .first()
-        )
-        
-        if not report or not report.full_content:
-            return "No report found."
+        prepared = self._prepare_question(project_id, question)
+        if "prompt" not in prepared:
+            return prepared
 
-        context = report.full_content[:4000]
+        try:
+            answer = self.qa_llm.generate(prepared["prompt"]).strip()
+        except Exception as e:
+            return {"answer": f"Error: {str(e)}", "section_ids": [], "chunk_ids": [], "cached": False}
+
+        return self._store_answer(prepared, question, answer)
+
+    async def aask_from_report(self, project_id: int, question: str):
+        # DB and retrieval work runs in a thread, the LLM wait stays on the event loop
+        prepared = await asyncio.to_thread(self._prepare_question, project_id, question)
+        if "prompt" not in prepared:
+            return prepared
+
+        try:
+            answer = (await self.qa_llm.agenerate(prepared["prompt"])).strip()
+        except Exception as e:
+            return {"answer": f"Error: {str(e)}", "section_ids": [], "chunk_ids": [], "cached": False}
+
+        return self._store_answer(prepared, question, answer)
+
+    def _prepare_question(self, project_id: int, question: str):
+        """
+        Returns a finished answer (cache hit, no report) or the prompt plus
+        what is needed to cache the answer once it is generated.
+        """
+        head = ReportRepository.head(self.db, project_id, Report.id, Report.revision, Report.content_hash)
+
+        if head:
+            cached = qa_cache.get(head.id, head.content_hash, question)
+            if cached is not None:
+                return {**cached, "cached": True}
+
+        section_index = self._section_index(head.id, head.revision) if head else None
+        if not section_index:
+            return {"answer": "No report found.", "section_ids": [], "chunk_ids": [], "cached": False}
+
+        try:
+            query = get_embedding_model().embed([question])
+        except Exception as e:
+            print(f" Question embedding unavailable: {e}")
+            query = None
+
+        if query is not None:
+            cached = qa_cache.get_similar(head.id, head.content_hash, query[0])
+            if cached is not None:
+                return {**cached, "cached": True}
+
+        # Retrieve the few passages relevant to this question, not the whole report
+        passages = []
+
+        bm25, rows = section_index
+        for i, _ in bm25.search(question, QA_TOP_K_SECTIONS):
+            section_id, title, content = rows[i]
+            passages.append(("section", section_id, f"{title}:\n{content}"))
+
+        try:
+            hits = VectorService.search(project_id, query, top_k=QA_TOP_K_CHUNKS)[0] if query is not None else []
+            chunk_ids = [chunk_id for chunk_id, _ in hits]
+            if chunk_ids:
+                texts = dict(
+                    self.db.query(Chunk.id, Chunk.content).filter(Chunk.id.in_(chunk_ids)).all()
+                )
+                for chunk_id in chunk_ids:
+                    if chunk_id in texts:
+                        passages.append(("chunk", chunk_id, texts[chunk_id]))
+        except Exception as e:
+            print(f" Chunk retrieval unavailable: {e}")
+
+        # Pack passages in rank order until the token budget runs out
+        context_parts = []
+        cited = {"section": [], "chunk": []}
+        budget = QA_CONTEXT_TOKENS
+
+        for kind, passage_id, text in passages:
+            if budget <= 0:
+                break
+
+            tokens = count_tokens(text)
+            if tokens > budget:
+                text = truncate_to_tokens(text, budget)
+                tokens = budget
+
+            context_parts.append(text)
+            if passage_id is not None:
+                cited[kind].append(passage_id)
+            budget -= tokens
+
+        context = "\n\n".join(context_parts)
 
         prompt = f"""Answer in 5 lines using this content:
 
@@ -218,85 +570,137 @@ Question: {question}
 
 Answer:"""
 
-        try:
-            return self.qa_llm.generate(prompt).strip()
-        except Exception as e:
-            return f"Error: {str(e)}"
+        return {
+            "prompt": prompt,
+            "report_id": head.id,
+            "content_hash": head.content_hash,
+            "vector": query[0] if query is not None else None,
+            "section_ids": cited["section"],
+            "chunk_ids": cited["chunk"],
+        }
+
+    def _store_answer(self, prepared: dict, question: str, answer: str):
+        result = {
+            "answer": answer,
+            "section_ids": prepared["section_ids"],
+            "chunk_ids": prepared["chunk_ids"],
+        }
+        qa_cache.put(prepared["report_id"], prepared["content_hash"], question, result, prepared["vector"])
+
+        return {**result, "cached": False}
+
+    def _section_index(self, report_id: int, revision: int):
+        """
+        BM25 index over the report's sections, cached per (report, revision).
+        Returns (index, [(section_id, title, content), ...]) or None.
+        """
+        key = (report_id, revision)
+        with ReportService._section_index_lock:
+            cached = ReportService._section_index_cache.get(key)
+            if cached is not None:
+                ReportService._section_index_cache.move_to_end(key)
+                return cached
+
+        rows = [
+            (s.id, s.title, s.content)
+            for s in (
+                self.db.query(ReportSection.id, ReportSection.title, ReportSection.content)
+                .filter(ReportSection.report_id == report_id)
+                .order_by(ReportSection.order)
+            )
+            if s.content
+        ]
 
-    def expand_to_ieee(self, project_id: int):
-        print("\n Generating IEEE paper...")
+        if not rows:
+            # Reports from before sections were stored: split the text on headings
+            full_content = self.db.query(Report.full_content).filter(Report.id == report_id).scalar()
+            if not full_content:
+                return None
 
-        existing = (
-            self.db.query(IEEEReport)
-            .filter(IEEEReport.project_id == project_id)
-            .order_by(desc(IEEEReport.id))
-            .first()
-        )
+            for block in full_content.split("\n## "):
+                title, _, body = block.partition("\n")
+                if body.strip():
+                    rows.append((None, title.lstrip("# ").strip(), body.strip()))
 
-        if existing and existing.full_content and len(existing.full_content) > 1000:
-            print(" Reusing existing IEEE report")
-            return existing
+        if not rows:
+            return None
 
-        report = (
-            self.db.query(Report)
-            .filter(Report.project_id == project_id)
-            .order_by(desc(Report.id))
-            .first()
-        )
+        entry = (BM25Index([f"{title}\n{content}" for _, title, content in rows]), rows)
+
+        with ReportService._section_index_lock:
+            ReportService._section_index_cache[key] = entry
+            while len(ReportService._section_index_cache) > 64:
+                ReportService._section_index_cache.popitem(last=False)
+
+        return entry
+
+    def expand_to_ieee(self, project_id: int):
+        print("\n Generating IEEE paper...")
+
+        report = ReportRepository.latest(self.db, project_id)
 
         if not report or not report.full_content:
             raise Exception("No base report found")
 
-        print(" Converting to IEEE format...")
+        existing = ReportRepository.latest_ieee(self.db, project_id, with_content=False)
 
-        #  REDUCED INPUT SIZE - only use first 6000 chars instead of 10000
-        prompt = f"""Convert this to IEEE paper format with these sections: Title, Abstract, Keywords, Introduction, Background, Core Concepts, Architecture, Applications, Advantages/Limitations, Conclusion, References.
-
-Use formal academic tone. Keep it concise.
+        # Still valid while the base report is unchanged
+        if existing and existing.report_hash and existing.report_hash == report.content_hash:
+            print(" Reusing existing IEEE report")
+            return existing
 
-Base report:
-{report.full_content[:6000]}
+        sections = self._ieee_source_sections(project_id, report)
+        topic = report.title.replace("Research:", "").strip()
+        body = [(row.title, row.content) for row in sections if row.title != "References"]
+        references = next((row.content for row in sections if row.title == "References"), "")
 
-Write IEEE paper:"""
+        if not body:
+            raise Exception("Base report has no sections")
 
-        try:
-            start_time = time.time()
-            ieee_text = self.ieee_llm.generate(prompt)
-            elapsed = time.time() - start_time
-            print(f" IEEE generated in {elapsed:.1f}s")
-            
-        except Exception as e:
-            print(f" IEEE generation error: {str(e)}")
-            # Fallback: use original report with IEEE header
-            ieee_text = f"""### Title: {report.title.replace('Research:', '').strip()}
+        print(f" Converting {len(body)} sections to IEEE format ({LLM_MAX_IN_FLIGHT} in flight)...")
 
-### Abstract:
-{report.full_content[:1000]}
+        # Map: every section on its own, plus the front matter, in one bounded batch.
+        # Prompts only depend on their section, so unchanged sections hit the cache
+        jobs = [self._ieee_section_prompt(topic, title, content) for title, content in body]
+        jobs.append(self._ieee_front_matter_prompt(topic, body))
 
-### Keywords:
-Research, Analysis, Technology
+        outputs = [None] * len(jobs)
+        start_time = time.time()
+        def convert(prompt):
+            return self.ieee_llm.generate(prompt, min_cache_chars=IEEE_SECTION_MIN_CHARS)
 
-{report.full_content}
-"""
-            print(" Using fallback IEEE format")
+        for idx, result, error in run_bounded(convert, jobs, LLM_MAX_IN_FLIGHT):
+            if error:
+                print(f"   ✗ IEEE part {idx + 1}/{len(jobs)}: {error}")
+            outputs[idx] = (result or "").strip()
+        print(f" IEEE generated in {time.time() - start_time:.1f}s")
 
-        if not ieee_text or len(ieee_text.strip()) < 500:
-            print(" IEEE output too short, using fallback")
-            ieee_text = f"""### Title: {report.title.replace('Research:', '').strip()}
+        # Reduce: front matter, then the converted sections in report order
+        title, abstract, keywords = self._parse_front_matter(outputs[-1])
+        ieee_text = f"""### Title: {title or topic}
 
 ### Abstract:
-{report.full_content[:1000]}
+{abstract or body[0][1][:1000]}
 
 ### Keywords:
-Research, Analysis, Technology
-
-{report.full_content}
+{keywords or "Research, Analysis, Technology"}
 """
 
+        for number, ((section_title, content), converted) in enumerate(zip(body, outputs), 1):
+            if len(converted) < IEEE_SECTION_MIN_CHARS:
+                # Keep the original text when the conversion failed or came back empty
+                converted = content
+            ieee_text += f"\n## {self._roman(number)}. {section_title}\n\n{converted}\n"
+
+        if references:
+            cited = [line.split(". ", 1)[-1].strip() for line in references.splitlines() if line.strip()]
+            ieee_text += "\n## References\n\n" + "".join(f"[{n}] {url}\n" for n, url in enumerate(cited, 1))
+
         ieee = IEEEReport(
             project_id=project_id,
-            title=f"IEEE: {report.title.replace('Research:', '').strip()}",
-            full_content=ieee_text
+            title=f"IEEE: {topic}",
+            full_content=ieee_text,
+            report_hash=report.content_hash
         )
 
         self.db.add(ieee)
@@ -307,23 +711,89 @@ Research, Analysis, Technology
 
         return ieee
 
+    def _ieee_source_sections(self, project_id: int, report):
+        sections = (
+            self.db.query(ReportSection)
+            .filter(ReportSection.report_id == report.id)
+            .order_by(ReportSection.order)
+            .all()
+        )
+        if not sections:
+            # Reports written before sections were stored
+            self.split_report_into_sections(project_id)
+            sections = (
+                self.db.query(ReportSection)
+                .filter(ReportSection.report_id == report.id)
+                .order_by(ReportSection.order)
+                .all()
+            )
+        return [row for row in sections if row.content and row.content != " Generating..."]
+
+    @staticmethod
+    def _ieee_section_prompt(topic: str, title: str, content: str) -> str:
+        return f"""Rewrite this {title} section of a research paper on {topic} in IEEE style.
+
+Use formal academic tone. Keep the facts, keep it concise, do not add a heading.
+
+{truncate_to_tokens(content, SECTION_CONTEXT_TOKENS)}
+
+IEEE {title}:"""
+
+    @staticmethod
+    def _ieee_front_matter_prompt(topic: str, body: list) -> str:
+        # Opening and closing sections summarize the paper well enough
+        summary = "\n\n".join(content for _, content in body[:1] + body[-1:])
+
+        return f"""Write the front matter of an IEEE paper on {topic}.
+
+Sections: {", ".join(title for title, _ in body)}
+
+Paper summary:
+{truncate_to_tokens(summary, SECTION_CONTEXT_TOKENS)}
+
+Answer in exactly this format:
+Title: <paper title>
+Abstract: <one paragraph of 150-200 words>
+Keywords: <5 to 7 comma-separated keywords>"""
+
+    @staticmethod
+    def _parse_front_matter(text: str):
+        fields = {"title": "", "abstract": "", "keywords": ""}
+        current = None
+        for line in (text or "").splitlines():
+            label, colon, rest = line.partition(":")
+            key = label.strip().strip("*#").strip().lower()
+            if key in fields and colon:
+                current = key
+                fields[key] = rest.strip()
+            elif current and line.strip():
+                fields[current] = f"{fields[current]} {line.strip()}".strip()
+        return fields["title"].strip("*\"' "), fields["abstract"], fields["keywords"]
+
+    @staticmethod
+    def _roman(number: int) -> str:
+        numerals = [(10, "X"), (9, "IX"), (5, "V"), (4, "IV"), (1, "I")]
+        out = ""
+        for value, numeral in numerals:
+            while number >= value:
+                out += numeral
+                number -= value
+        return out
+
     def split_report_into_sections(self, project_id: int):
         print("\n Splitting into sections...")
 
-        report = (
-            self.db.query(Report)
-            .filter(Report.project_id == project_id)
-            .order_by(desc(Report.id))
-            .first()
-        )
+        report = ReportRepository.latest(self.db, project_id)
 
         if not report or not report.full_content:
             raise Exception("No report to split")
 
-        self.db.query(ReportSection).filter(
-            ReportSection.report_id == report.id
-        ).delete()
-        self.db.commit()
+        # Generation writes the sections itself, with the fingerprints that let
+        # ?refresh=true skip unchanged ones; only older reports need splitting
+        existing = self.db.query(ReportSection.id).filter(ReportSection.report_id == report.id).count()
+        if existing:
+            print(f" Already split into {existing} sections")
+            return {"sections_created": 0}
 
         lines = report.full_content.split("\n")
         sections = []
@@ -357,19 +827,24 @@ Research, Analysis, Technology
             if len(content_text) >= 200:
                 sections.append((current_title, content_text, order))
 
+        revision = (report.revision or 0) + 1
+
         objects = []
         for title, content, order_num in sections:
             obj = ReportSection(
                 report_id=report.id,
                 title=title,
                 content=content,
-                order=order_num
+                order=order_num,
+                revision=revision
             )
             objects.append(obj)
 
         if objects:
             self.db.bulk_save_objects(objects)
-            self.db.commit()
             print(f" Split into {len(objects)} sections")
 
+        # Section ids changed, so delta pollers must resync
+        self._save_revision(report, report.full_content)
+
         return {"sections_created": len(objects)}
\ No newline at end of file
@@ -0,0 +1,99 @@
+import threading
+from datetime import datetime, timedelta
+
+from app.core.config import (
+    SCRAPE_CACHE_ENABLED,
+    SCRAPE_CACHE_TTL_SECONDS,
+    SCRAPE_CACHE_MAX_ENTRIES,
+    SCRAPE_CACHE_MAX_BYTES,
+)
+from app.database.session import SessionLocal
+from app.repositories.page_cache_repository import PageCacheRepository
+
+
+class ScrapeCache:
+    """
+    URL-keyed cache of cleaned page text in the page_cache table. Each call
+    uses its own short session, so it is safe from scrape worker threads.
+    """
+
+    _stores = 0
+    _lock = threading.Lock()
+
+    @staticmethod
+    def lookup(url: str):
+        """
+        Returns (entry, fresh) where entry is a dict or None. A stale entry
+        carries the validators for a conditional GET.
+        """
+        if not SCRAPE_CACHE_ENABLED:
+            return None, False
+
+        db = SessionLocal()
+        try:
+            entry = PageCacheRepository.get(db, url)
+            if not entry:
+                return None, False
+
+            fresh = entry.fetched_at and entry.fetched_at > datetime.utcnow() - timedelta(seconds=SCRAPE_CACHE_TTL_SECONDS)
+            if fresh:
+                PageCacheRepository.touch(db, entry)
+
+            return {
+                "title": entry.title,
+                "content": entry.content,
+                "etag": entry.etag,
+                "last_modified": entry.last_modified,
+            }, bool(fresh)
+        except Exception as e:
+            print(" Scrape cache read failed:", e)
+            return None, False
+        finally:
+            db.close()
+
+    @staticmethod
+    def conditional_headers(entry) -> dict:
+        headers = {}
+        if entry and entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry and entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    @staticmethod
+    def revalidated(url: str):
+        if not SCRAPE_CACHE_ENABLED:
+            return
+
+        db = SessionLocal()
+        try:
+            entry = PageCacheRepository.get(db, url)
+            if entry:
+                PageCacheRepository.touch(db, entry, revalidated=True)
+        except Exception as e:
+            print(" Scrape cache update failed:", e)
+        finally:
+            db.close()
+
+    @staticmethod
+    def store(url: str, title: str, content: str, etag: str = None, last_modified: str = None):
+        if not SCRAPE_CACHE_ENABLED or not content:
+            return
+
+        db = SessionLocal()
+        try:
+            PageCacheRepository.upsert(db, url, title, content, etag, last_modified)
+
+            # Size sweep every few writes, not on each one
+            with ScrapeCache._lock:
+                ScrapeCache._stores += 1
+                sweep = ScrapeCache._stores % 50 == 0
+            if sweep:
+                evicted = PageCacheRepository.evict(db, SCRAPE_CACHE_MAX_ENTRIES, SCRAPE_CACHE_MAX_BYTES)
+                if evicted:
+                    print(f" Scrape cache evicted {evicted} page(s)")
+        except Exception as e:
+            db.rollback()
+            print(" Scrape cache write failed:", e)
+        finally:
+            db.close()
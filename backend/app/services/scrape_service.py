@@ -1,5 +1,5 @@
-import requests
-from bs4 import BeautifulSoup
+from app.core import http
+from app.services.html_extract import get_extractor
 
 
 class ScrapeService:
@@ -9,29 +9,14 @@ class ScrapeService:
             if not url.startswith("http"):
                 url = "https://" + url
 
-            headers = {
-                "User-Agent": "Mozilla/5.0"
-            }
-
-            r = requests.get(url, headers=headers, timeout=25)
-            soup = BeautifulSoup(r.text, "html.parser")
-
-            for tag in soup(["script", "style", "noscript", "header", "footer", "nav", "form", "aside"]):
-                tag.decompose()
-
-            paragraphs = []
-            for p in soup.find_all("p"):
-                text = p.get_text().strip()
-                if len(text) > 80:
-                    paragraphs.append(text)
-
-            text = "\n\n".join(paragraphs)
+            r = http.request("GET", url, timeout=25)
+            text = get_extractor().paragraphs(r.text, 20000, min_len=80)
 
             if len(text) < 1500:
                 print(" Too little content from:", url)
                 return ""
 
-            return text[:20000]
+            return text
 
         except Exception as e:
             print(" Scrape failed:", url, e)
@@ -1,19 +1,93 @@
-import numpy as np
-import faiss
+import os
+import threading
+from collections import OrderedDict
 from typing import List
 
+import numpy as np
+
+from app.core.config import VECTOR_INDEX_DIR, VECTOR_INDEX_CACHE_SIZE
+from app.vectorstore.faiss_store import FaissVectorStore
+
+
 class VectorService:
-    def __init__(self, dim: int):
-        self.dim = dim
-        self.index = faiss.IndexFlatL2(dim)
-        self.texts = []
-
-    def add_embeddings(self, embeddings: List[List[float]], texts: List[str]):
-        vectors = np.array(embeddings).astype("float32")
-        self.index.add(vectors)
-        self.texts.extend(texts)
-
-    def query(self, query_embedding: List[float], top_k: int = 5):
-        q = np.array([query_embedding]).astype("float32")
-        dist, ids = self.index.search(q, top_k)
-        return [self.texts[i] for i in ids[0]]
+    """
+    One on-disk FAISS index per project, ids are Chunk.id. Indexes are
+    opened on first search with their vectors memory-mapped (only the id map
+    is read into RAM) and kept in a small LRU, so a worker can serve many
+    projects without holding every index in memory.
+    """
+
+    _cache = OrderedDict()
+    _lock = threading.RLock()
+
+    @staticmethod
+    def index_path(project_id: int) -> str:
+        return os.path.join(VECTOR_INDEX_DIR, f"project_{project_id}.faiss")
+
+    @staticmethod
+    def add_chunks(project_id: int, chunk_ids: List[int], vectors: np.ndarray):
+        if not chunk_ids:
+            return
+
+        path = VectorService.index_path(project_id)
+
+        with VectorService._lock:
+            # Mapped indexes are read-only, so appends go through a full load
+            if os.path.exists(path):
+                store = FaissVectorStore.load(path)
+            else:
+                os.makedirs(VECTOR_INDEX_DIR, exist_ok=True)
+                store = FaissVectorStore(vectors.shape[1])
+
+            store.add(vectors, chunk_ids)
+            store.save(path)
+            VectorService._cache.pop(project_id, None)
+
+        print(f" Indexed {len(chunk_ids)} chunks for project {project_id} ({store.size} total)")
+
+    @staticmethod
+    def missing_ids(project_id: int, chunk_ids: List[int]) -> List[int]:
+        """
+        The chunk ids not yet in the project's index, so re-runs only embed new chunks.
+        """
+        store = VectorService._get(project_id)
+        if store is None:
+            return list(chunk_ids)
+        indexed = set(store.ids())
+        return [chunk_id for chunk_id in chunk_ids if chunk_id not in indexed]
+
+    @staticmethod
+    def search(project_id: int, query_vectors: np.ndarray, top_k: int = 5):
+        """
+        Returns [(chunk_id, score), ...] for every query row.
+        """
+        store = VectorService._get(project_id)
+        if store is None:
+            return [[] for _ in range(len(query_vectors))]
+        return store.search_many(query_vectors, top_k)
+
+    @staticmethod
+    def delete_index(project_id: int):
+        with VectorService._lock:
+            VectorService._cache.pop(project_id, None)
+            path = VectorService.index_path(project_id)
+            if os.path.exists(path):
+                os.remove(path)
+
+    @staticmethod
+    def _get(project_id: int):
+        with VectorService._lock:
+            store = VectorService._cache.get(project_id)
+            if store is not None:
+                VectorService._cache.move_to_end(project_id)
+                return store
+
+            path = VectorService.index_path(project_id)
+            if not os.path.exists(path):
+                return None
+
+            store = FaissVectorStore.load(path, mmap=True)
+            VectorService._cache[project_id] = store
+            while len(VectorService._cache) > VECTOR_INDEX_CACHE_SIZE:
+                VectorService._cache.popitem(last=False)
+            return store
@@ -1,111 +1,258 @@
-import requests
 import urllib.parse
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import TimeoutError as FuturesTimeoutError
+
+from app.core import http
+from app.services.scrape_cache import ScrapeCache
+from app.services.html_extract import get_extractor, stream_extract
+from app.core.config import HTML_STREAMING, HTML_MAX_BYTES
+from app.core.config import SCRAPE_MAX_WORKERS, SCRAPE_PER_HOST_LIMIT, SCRAPE_DEADLINE_SECONDS
+
+
+SEARCH_URL = "https://en.wikipedia.org/w/api.php"
+
+# Limit size
+SCRAPE_MAX_CHARS = 30000
 
 
 class WebSearchService:
     @staticmethod
-    def search(query: str, max_results: int = 5):
-        print(" Searching Wikipedia for:", query)
-
-        search_url = "https://en.wikipedia.org/w/api.php"
-        params = {
+    def _search_params(query: str) -> dict:
+        return {
             "action": "query",
             "list": "search",
             "srsearch": query,
             "format": "json"
         }
 
-        headers = {
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AutoResearchBot/1.0"
+    @staticmethod
+    def search(query: str, max_results: int = 5):
+        print(" Searching Wikipedia for:", query)
+
+        try:
+            r = http.request("GET", SEARCH_URL, params=WebSearchService._search_params(query), timeout=20)
+            return WebSearchService._parse_search(r, max_results)
+
+        except Exception as e:
+            print(" Wikipedia search failed with exception:", e)
+            return []
+
+    @staticmethod
+    def search_with_extracts(query: str, max_results: int = 5):
+        """
+        Search plus plaintext page extracts straight from the MediaWiki API,
+        no HTML download or parsing. Returns (url, title, text) in search
+        rank order; text is "" for pages the API gave no usable extract for.
+        """
+        print(" Searching Wikipedia (extracts) for:", query)
+
+        params = {
+            "action": "query",
+            "format": "json",
+            "formatversion": "2",
+            "generator": "search",
+            "gsrsearch": query,
+            "gsrlimit": max_results,
+            "prop": "extracts|info",
+            "inprop": "url",
+            "explaintext": "1",
+            "exsectionformat": "plain",
+            "exlimit": "max",
         }
 
+        pages = {}
+
         try:
-            r = requests.get(search_url, params=params, headers=headers, timeout=20)
+            # TextExtracts returns one whole-page extract per response, the
+            # rest arrive through `continue` (still small JSON, no HTML)
+            for _ in range(max_results + 1):
+                r = http.request("GET", SEARCH_URL, params=params, timeout=20)
+                if r.status_code != 200:
+                    print(" Wikipedia HTTP error:", r.status_code)
+                    break
 
-            print(" Wikipedia status code:", r.status_code)
+                data = r.json()
+                for page in data.get("query", {}).get("pages", []):
+                    entry = pages.setdefault(page["pageid"], {"index": page.get("index", 0)})
+                    entry["title"] = page.get("title", "")
+                    entry["url"] = page.get("fullurl") or WebSearchService._page_url(entry["title"])
+                    if page.get("extract"):
+                        entry["extract"] = page["extract"]
 
-            if r.status_code != 200:
-                print(" Wikipedia HTTP error")
-                print(r.text[:500])
-                return []
+                cont = data.get("continue")
+                # Stop once extracts are done and only the next search page is left
+                if not cont or "excontinue" not in cont:
+                    break
+                params = {**params, **cont}
 
-            # DEBUG: check what we actually got
-            if not r.text.strip().startswith("{"):
-                print(" Wikipedia returned non-JSON content:")
-                print(r.text[:500])
-                return []
+        except Exception as e:
+            print(" Wikipedia extracts failed with exception:", e)
 
-            data = r.json()
+        results = []
+        for entry in sorted(pages.values(), key=lambda p: p["index"]):
+            text = " ".join(entry.get("extract", "").split())[:30000]
+            if len(text) < 1500:
+                text = ""
+            else:
+                ScrapeCache.store(entry["url"], entry["title"], text)
+            results.append((entry["url"], entry["title"], text))
+
+        print(f" Got {sum(1 for r in results if r[2])}/{len(results)} extracts")
+        return results
+
+    @staticmethod
+    def _page_url(title: str) -> str:
+        title_encoded = urllib.parse.quote(title.replace(" ", "_"))
+        return f"https://en.wikipedia.org/wiki/{title_encoded}"
 
-            if "query" not in data or "search" not in data["query"]:
-                print(" Wikipedia JSON has no search results")
-                print(data)
-                return []
+    @staticmethod
+    def _parse_search(r, max_results: int):
+        print(" Wikipedia status code:", r.status_code)
 
-            results = data["query"]["search"]
+        if r.status_code != 200:
+            print(" Wikipedia HTTP error")
+            print(r.text[:500])
+            return []
 
-            if not results:
-                print(" No Wikipedia pages found")
-                return []
+        # DEBUG: check what we actually got
+        if not r.text.strip().startswith("{"):
+            print(" Wikipedia returned non-JSON content:")
+            print(r.text[:500])
+            return []
 
-            urls = []
-            for item in results[:max_results]:
-                title = item["title"]
-                title_encoded = urllib.parse.quote(title.replace(" ", "_"))
-                page_url = f"https://en.wikipedia.org/wiki/{title_encoded}"
-                urls.append(page_url)
+        data = r.json()
 
-            print(" Found URLs:")
-            for u in urls:
-                print("   ", u)
+        if "query" not in data or "search" not in data["query"]:
+            print(" Wikipedia JSON has no search results")
+            print(data)
+            return []
 
-            return urls
+        results = data["query"]["search"]
 
-        except Exception as e:
-            print(" Wikipedia search failed with exception:", e)
+        if not results:
+            print(" No Wikipedia pages found")
             return []
 
+        urls = []
+        for item in results[:max_results]:
+            urls.append(WebSearchService._page_url(item["title"]))
+
+        print(" Found URLs:")
+        for u in urls:
+            print("   ", u)
+
+        return urls
+
 
 class WebScraper:
     @staticmethod
     def scrape(url: str):
         try:
+            cached, fresh = ScrapeCache.lookup(url)
+            if fresh:
+                print(" Cached:", url)
+                return cached["title"], cached["content"]
+
             print(" Scraping:", url)
+            headers = ScrapeCache.conditional_headers(cached)
+
+            if not HTML_STREAMING:
+                r = http.request("GET", url, headers=headers, timeout=25)
+                return WebScraper._handle_response(url, r, cached)
+
+            with http.stream("GET", url, headers=headers, timeout=25) as r:
+                if r.status_code == 304 and cached:
+                    return WebScraper._handle_response(url, r, cached)
+
+                # Parse while downloading, stop reading once there is enough text
+                title, text, read = stream_extract(r.iter_bytes(), SCRAPE_MAX_CHARS, HTML_MAX_BYTES)
+                print(f" Read {read // 1024} KB")
+
+            return WebScraper._handle_response(url, r, cached, parsed=(title or url, text))
 
-            headers = {
-                "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AutoResearchBot/1.0"
-            }
+        except Exception as e:
+            print(" Scrape failed:", e)
+            return url, ""
 
-            r = requests.get(url, headers=headers, timeout=25)
+    @staticmethod
+    def _handle_response(url: str, r, cached, parsed=None):
+        # Unchanged since we cached it: skip download and parsing entirely
+        if r.status_code == 304 and cached:
+            print(" Not modified:", url)
+            ScrapeCache.revalidated(url)
+            return cached["title"], cached["content"]
 
-            from bs4 import BeautifulSoup
-            soup = BeautifulSoup(r.text, "html.parser")
+        title, text = parsed if parsed else WebScraper._parse_page(url, r.text)
 
-            # Remove junk
-            for s in soup(["script", "style", "noscript", "header", "footer", "nav", "form", "aside"]):
-                s.extract()
+        if len(text) < 1500:
+            print(" Too little content")
+            text = ""
+        else:
+            print(" Scraped", len(text), "chars")
+
+        if r.status_code == 200 and text:
+            ScrapeCache.store(
+                url,
+                title,
+                text,
+                etag=r.headers.get("ETag"),
+                last_modified=r.headers.get("Last-Modified"),
+            )
 
-            content = soup.find("div", {"id": "mw-content-text"})
-            if not content:
-                print(" No content div found")
-                return url, ""
+        return title, text
 
-            text = content.get_text(separator=" ")
-            text = " ".join(text.split())
+    @staticmethod
+    def _parse_page(url: str, html: str):
+        title, text = get_extractor().extract(html, SCRAPE_MAX_CHARS)
+        if not text:
+            print(" No content div found")
+        return title or url, text
 
-            # Limit size
-            text = text[:30000]
+    @staticmethod
+    def scrape_many(
+        urls,
+        max_workers: int = SCRAPE_MAX_WORKERS,
+        per_host: int = SCRAPE_PER_HOST_LIMIT,
+        deadline: float = SCRAPE_DEADLINE_SECONDS,
+    ):
+        """
+        Scrapes all URLs concurrently and returns (url, title, content) tuples
+        in the same order as `urls`. Pages that fail or are still running when
+        the deadline expires come back with empty content.
+        """
+        results = [(url, url, "") for url in urls]
+        if not urls:
+            return results
 
-            title = soup.title.string if soup.title else url
+        # One semaphore per host so a single site never gets more than `per_host` requests
+        host_limits = {}
+        for url in urls:
+            host = urllib.parse.urlparse(url).netloc
+            if host not in host_limits:
+                host_limits[host] = threading.BoundedSemaphore(per_host)
 
-            if len(text) < 1500:
-                print(" Too little content")
-                return title, ""
+        def fetch(url):
+            with host_limits[urllib.parse.urlparse(url).netloc]:
+                return WebScraper.scrape(url)
 
-            print(" Scraped", len(text), "chars")
+        pool = ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(urls))))
+        futures = {pool.submit(fetch, url): i for i, url in enumerate(urls)}
 
-            return title, text
+        try:
+            for future in as_completed(futures, timeout=deadline):
+                i = futures[future]
+                try:
+                    title, content = future.result()
+                except Exception as e:
+                    print(" Scrape failed:", urls[i], e)
+                    continue
+                results[i] = (urls[i], title, content)
+        except FuturesTimeoutError:
+            pending = sum(1 for f in futures if not f.done())
+            print(f" Scrape deadline ({deadline:.0f}s) reached, dropping {pending} page(s)")
+        finally:
+            # Don't wait for stragglers past the deadline
+            pool.shutdown(wait=False, cancel_futures=True)
 
-        except Exception as e:
-            print(" Scrape failed:", e)
-            return url, ""
+        return results
@@ -1,38 +1,103 @@
+import os
+import threading
+
 import faiss
 import numpy as np
 from sentence_transformers import SentenceTransformer
 
+from app.core.config import EMBED_MODEL_NAME, EMBED_BATCH_SIZE
+
 
 class FaissVectorStore:
+    """
+    Inner-product index over normalized vectors, keyed by external ids
+    (Chunk.id). Texts and metadata stay in the database.
+    """
+
+    def __init__(self, dim: int = None, index=None):
+        self.index = index if index is not None else faiss.IndexIDMap2(faiss.IndexFlatIP(dim))
+
+    @property
+    def size(self) -> int:
+        return self.index.ntotal
 
-    def __init__(self, dim: int):
-        self.index = faiss.IndexFlatL2(dim)
-        self.texts = []
-        self.metadatas = []
+    def ids(self) -> list[int]:
+        return faiss.vector_to_array(self.index.id_map).tolist()
 
-    def add(self, vectors: np.ndarray, texts: list[str], metadatas: list[dict]):
-        self.index.add(vectors)
-        self.texts.extend(texts)
-        self.metadatas.extend(metadatas)
+    def add(self, vectors: np.ndarray, ids: list[int]):
+        self.index.add_with_ids(vectors, np.asarray(ids, dtype="int64"))
+
+    def remove(self, ids: list[int]):
+        self.index.remove_ids(np.asarray(ids, dtype="int64"))
 
     def search(self, query_vector: np.ndarray, top_k: int = 5):
-        D, I = self.index.search(query_vector, top_k)
-        results = []
-        for idx in I[0]:
-            if idx < len(self.texts):
-                results.append({
-                    "text": self.texts[idx],
-                    "metadata": self.metadatas[idx]
-                })
-        return results
+        return self.search_many(query_vector, top_k)[0]
+
+    def search_many(self, query_vectors: np.ndarray, top_k: int = 5):
+        # One FAISS call for every query row, returns [(id, score), ...] per row
+        if self.size == 0:
+            return [[] for _ in range(len(query_vectors))]
+
+        D, I = self.index.search(query_vectors, min(top_k, self.size))
+        return [
+            [(int(i), float(d)) for i, d in zip(ids, scores) if i != -1]
+            for ids, scores in zip(I, D)
+        ]
+
+    def save(self, path: str):
+        # Write then rename, so readers never map a half-written file
+        tmp_path = path + ".tmp"
+        faiss.write_index(self.index, tmp_path)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str, mmap: bool = False):
+        """
+        With mmap the flat vector codes stay in the page cache and are paged
+        in by searches; only the id map is read into memory. IO_FLAG_MMAP
+        alone still copies flat codes into RAM, IO_FLAG_MMAP_IFC maps them.
+        """
+        if mmap:
+            flags = getattr(faiss, "IO_FLAG_MMAP_IFC", faiss.IO_FLAG_MMAP) | getattr(faiss, "IO_FLAG_READ_ONLY", 0)
+            try:
+                return cls(index=faiss.read_index(path, flags))
+            except RuntimeError as e:
+                # Older faiss builds can't mmap every index type
+                print(" FAISS mmap load failed, reading into memory:", e)
+
+        return cls(index=faiss.read_index(path))
 
 
 class EmbeddingModel:
 
     def __init__(self):
         # Downloads once, then works offline
-        self.model = SentenceTransformer("all-MiniLM-L6-v2")
+        self.model = SentenceTransformer(EMBED_MODEL_NAME)
+
+    @property
+    def dim(self) -> int:
+        return self.model.get_sentence_embedding_dimension()
 
     def embed(self, texts: list[str]) -> np.ndarray:
-        vectors = self.model.encode(texts, show_progress_bar=False)
+        # Normalized, so the inner-product index scores are cosine similarities
+        vectors = self.model.encode(
+            texts,
+            batch_size=EMBED_BATCH_SIZE,
+            normalize_embeddings=True,
+            show_progress_bar=False,
+        )
         return np.array(vectors).astype("float32")
+
+
+_embedding_model = None
+_embedding_lock = threading.Lock()
+
+
+def get_embedding_model() -> EmbeddingModel:
+    # Loading the model takes seconds, so share one per process
+    global _embedding_model
+    if _embedding_model is None:
+        with _embedding_lock:
+            if _embedding_model is None:
+                _embedding_model = EmbeddingModel()
+    return _embedding_model
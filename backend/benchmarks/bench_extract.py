@@ -0,0 +1,103 @@
+# Compares HTML extraction backends on saved Wikipedia pages.
+#
+#   python -m benchmarks.bench_extract --fetch "Python (programming language)" "Alan Turing"
+#   python -m benchmarks.bench_extract
+#
+# --fetch saves pages into benchmarks/pages/ first. Run from backend/.
+import argparse
+import glob
+import os
+import sys
+import time
+import urllib.parse
+
+sys.path.append(os.getcwd())
+
+from app.services.html_extract import get_extractor, stream_extract
+
+PAGES_DIR = os.path.join(os.path.dirname(__file__), "pages")
+MAX_CHARS = 30000
+MAX_BYTES = 3 * 1024 * 1024
+
+
+def fetch(titles):
+    from app.core import http
+
+    os.makedirs(PAGES_DIR, exist_ok=True)
+    for title in titles:
+        url = "https://en.wikipedia.org/wiki/" + urllib.parse.quote(title.replace(" ", "_"))
+        r = http.request("GET", url, timeout=30)
+        r.raise_for_status()
+        path = os.path.join(PAGES_DIR, title.replace(" ", "_").replace("/", "_") + ".html")
+        with open(path, "wb") as f:
+            f.write(r.content)
+        print(f" saved {path} ({len(r.content) // 1024} KB)")
+
+
+def bench(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--fetch", nargs="*", help="Wikipedia titles to download first")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    if args.fetch:
+        fetch(args.fetch)
+
+    paths = sorted(glob.glob(os.path.join(PAGES_DIR, "*.html")))
+    if not paths:
+        print("No pages in", PAGES_DIR, "- run with --fetch TITLE ...")
+        return
+
+    pages = [(os.path.basename(p), open(p, "rb").read()) for p in paths]
+    total_kb = sum(len(b) for _, b in pages) // 1024
+    print(f"{len(pages)} pages, {total_kb} KB, best of {args.repeat}\n")
+
+    backends = []
+    for name in ("bs4", "lxml", "selectolax"):
+        try:
+            extractor = get_extractor(name)
+            extractor.extract("<html><body><div id='mw-content-text'>x</div></body></html>", 10)
+            backends.append((name, extractor))
+        except ImportError:
+            print(f" {name}: not installed, skipped")
+
+    print(f"{'backend':<14}{'ms/page':>10}{'chars':>10}{'KB read':>10}{'speedup':>10}")
+
+    baseline = None
+    for name, extractor in backends:
+        def run():
+            return [extractor.extract(raw.decode("utf-8", "replace"), MAX_CHARS)[1] for _, raw in pages]
+
+        seconds, texts = bench(run, args.repeat)
+        baseline = baseline or seconds
+        chars = sum(len(t) for t in texts) // len(pages)
+        print(f"{name:<14}{seconds * 1000 / len(pages):>10.1f}{chars:>10}{total_kb // len(pages):>10}{baseline / seconds:>9.1f}x")
+
+    # Streaming mode: feed 64 KB chunks like a download, stop early
+    def run_stream():
+        out = []
+        for _, raw in pages:
+            chunks = (raw[i:i + 65536] for i in range(0, len(raw), 65536))
+            out.append(stream_extract(chunks, MAX_CHARS, MAX_BYTES))
+        return out
+
+    try:
+        seconds, results = bench(run_stream, args.repeat)
+        chars = sum(len(t) for _, t, _ in results) // len(pages)
+        read_kb = sum(read for _, _, read in results) // 1024 // len(pages)
+        print(f"{'lxml-stream':<14}{seconds * 1000 / len(pages):>10.1f}{chars:>10}{read_kb:>10}{baseline / seconds:>9.1f}x")
+    except ImportError:
+        print(" lxml-stream: lxml not installed, skipped")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+# Times the PDF export on a synthetic ~100-page report, with peak Python memory.
+#
+#   python -m benchmarks.bench_pdf
+#   python -m benchmarks.bench_pdf --pages 300 --repeat 1
+#
+# Compares the platypus renderer with the old one-drawString-per-line canvas
+# loop. Run from backend/.
+import argparse
+import os
+import random
+import re
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.append(os.getcwd())
+
+from reportlab.lib.pagesizes import A4
+from reportlab.pdfgen import canvas
+
+from app.services.pdf_renderer import render_pdf
+
+# Roughly what one A4 page of 11pt body text holds
+WORDS_PER_PAGE = 670
+
+WORDS = (
+    "system model data network learning architecture performance analysis method "
+    "result approach research application design process structure algorithm "
+    "the of and to in is for with that as on by this are from be an which"
+).split()
+
+
+def make_report(pages: int, seed: int = 7) -> str:
+    rng = random.Random(seed)
+    parts = ["# Synthetic Benchmark Report\n"]
+    words_left = pages * WORDS_PER_PAGE
+    section = 0
+
+    while words_left > 0:
+        section += 1
+        parts.append(f"\n## Section {section}\n")
+        for _ in range(rng.randint(4, 8)):
+            # LLM output style: long single-line paragraphs
+            n = rng.randint(80, 220)
+            words_left -= n
+            sentence = " ".join(rng.choice(WORDS) for _ in range(n))
+            parts.append(sentence.capitalize() + ".\n")
+        parts.append("- First point about the method\n- Second point about the results\n")
+
+    return "\n".join(parts)
+
+
+def render_legacy(title: str, content: str, filepath: str):
+    # The previous exporter: one unwrapped drawString per line, cut at 1000 chars
+    c = canvas.Canvas(filepath, pagesize=A4)
+    width, height = A4
+    x, y = 50, height - 50
+
+    c.setFont("Times-Bold", 16)
+    c.drawString(x, y, title)
+    y -= 40
+    c.setFont("Times-Roman", 11)
+
+    for line in content.split("\n"):
+        if y < 50:
+            c.showPage()
+            c.setFont("Times-Roman", 11)
+            y = height - 50
+        c.drawString(x, y, line[:1000])
+        y -= 14
+
+    c.save()
+
+
+def measure(render, title, content, repeat):
+    path = os.path.join(tempfile.mkdtemp(), "bench.pdf")
+
+    # Timed runs without tracing, tracemalloc slows allocation-heavy code a lot
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        render(title, content, path)
+        best = min(best, time.perf_counter() - start)
+
+    tracemalloc.start()
+    render(title, content, path)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    with open(path, "rb") as f:
+        data = f.read()
+    os.remove(path)
+
+    pages = len(re.findall(rb"/Type /Page\b", data))
+    return best, peak, pages, len(data)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pages", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    content = make_report(args.pages)
+    print(f"Report: {len(content) // 1024} KB of Markdown, target {args.pages} pages\n")
+
+    print(f"{'renderer':<10} {'time':>9} {'peak mem':>10} {'pages':>6} {'size':>9}")
+    for name, render in (("legacy", render_legacy), ("platypus", render_pdf)):
+        best, peak, pages, size = measure(render, "Synthetic Benchmark Report", content, args.repeat)
+        print(f"{name:<10} {best * 1000:>7.0f}ms {peak / 1024 / 1024:>8.1f}MB {pages:>6} {size // 1024:>7}KB")
+
+    print("\nlegacy clips every paragraph at the page edge; platypus wraps it.")
+
+
+if __name__ == "__main__":
+    main()
@@ -13,8 +13,15 @@ function HomePage() {
   const navigate = useNavigate();
 
   const loadProjects = async () => {
-    const res = await api.get("/projects/");
-    setProjects(res.data);
+    // The list is paged; follow the cursor header until the last page
+    let all = [];
+    let cursor = null;
+    do {
+      const res = await api.get("/projects/", { params: cursor ? { cursor } : {} });
+      all = all.concat(res.data);
+      cursor = res.headers["x-next-cursor"] || null;
+    } while (cursor);
+    setProjects(all);
   };
 
   useEffect(() => {
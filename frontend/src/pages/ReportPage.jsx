@@ -17,25 +17,61 @@ function ReportPage() {
   const [asking, setAsking] = useState(false);
 
   useEffect(() => {
-    loadReport();
-    loadSources();
+    // Long-poll for revisions instead of re-downloading the report every few seconds
+    let active = true;
+    let revision = -1;
+    const sections = new Map();
+
+    const poll = async () => {
+      while (active) {
+        try {
+          const res = await api.get(`/projects/${projectId}/report`, {
+            params: { since_revision: revision, wait: revision < 0 ? 0 : 25 },
+            validateStatus: (status) => status === 200 || status === 304,
+          });
+
+          if (!active) return;
+
+          if (res.status === 200) {
+            revision = res.data.revision;
+            setReport(applyReportUpdate(res.data, sections));
+            loadSources();
+          }
+        } catch (err) {
+          console.error("No report yet");
+          await new Promise((resolve) => setTimeout(resolve, 3000));
+        }
+      }
+    };
+
+    poll();
+
+    return () => {
+      active = false;
+    };
+  }, [projectId]);
 
-    // Start polling for live updates
-    const interval = setInterval(() => {
-      loadReport();
-      loadSources();
-    }, 3000);
+  const applyReportUpdate = (data, sections) => {
+    if (!data.delta) {
+      sections.clear();
+      return data;
+    }
 
-    return () => clearInterval(interval);
-  }, [projectId]);
+    data.sections.forEach((s) => sections.set(s.id, s));
 
-  const loadReport = async () => {
-    try {
-      const res = await api.get(`/projects/${projectId}/report`);
-      setReport(res.data);
-    } catch (err) {
-      console.error("No report yet");
+    // Drop sections that no longer exist (report regenerated or re-split)
+    const ordered = data.section_ids
+      .filter((id) => sections.has(id))
+      .map((id) => sections.get(id));
+    for (const id of [...sections.keys()]) {
+      if (!data.section_ids.includes(id)) sections.delete(id);
     }
+
+    const fullContent = ordered
+      .map((s) => `## ${s.title}\n\n${s.content}`)
+      .join("\n\n");
+
+    return { ...data, full_content: fullContent };
   };
 
   const loadSources = async () => {